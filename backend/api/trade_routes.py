@@ -7,7 +7,9 @@ API endpoints for comprehensive trade recording, tracking, and display
 from fastapi import APIRouter, HTTPException, BackgroundTasks
 from pydantic import BaseModel
 from typing import Dict, List, Optional, Any
+from collections import Counter, defaultdict
 from datetime import datetime
+from itertools import chain
 import logging
 
 import sqlite3
@@ -200,7 +202,7 @@ async def get_trade_details(trade_id: str):
     """Get detailed information about a specific trade"""
     try:
         trade_service = get_trade_recording_service()
-        trade = trade_service.get_trade_by_id(trade_id)
+        trade = await trade_service.get_trade_by_id(trade_id)
         
         if not trade:
             raise HTTPException(status_code=404, detail="Trade not found")
@@ -321,20 +323,8 @@ async def clear_ea_trades(magic_number: int):
     try:
         trade_service = get_trade_recording_service()
         
-        # Remove from active trades
-        trades_to_remove = []
-        for trade_id, trade in trade_service.active_trades.items():
-            if trade.magic_number == magic_number:
-                trades_to_remove.append(trade_id)
-        
-        for trade_id in trades_to_remove:
-            del trade_service.active_trades[trade_id]
-        
-        # Remove from history
-        trade_service.trade_history = [
-            trade for trade in trade_service.trade_history 
-            if trade.magic_number != magic_number
-        ]
+        # Remove from active trades and history
+        cleared_active = trade_service.clear_ea_trades(magic_number)
         
         logger.info(f"Cleared all trades for EA {magic_number}")
         
@@ -342,7 +332,7 @@ async def clear_ea_trades(magic_number: int):
             "success": True,
             "message": f"All trades cleared for EA {magic_number}",
             "magic_number": magic_number,
-            "cleared_active": len(trades_to_remove)
+            "cleared_active": cleared_active
         }
         
     except Exception as e:
@@ -534,32 +524,39 @@ async def get_trade_statistics():
         
         # Get all trades
         all_active = list(trade_service.active_trades.values())
-        all_history = trade_service.trade_history
+        all_history = list(trade_service.trade_history)
+        
+        # Count trades per (EA, status) and sum closed profit per EA
+        status_counts = Counter((t.magic_number, t.status) for t in chain(all_active, all_history))
+        closed_profit = defaultdict(float)
+        for trade in all_history:
+            if trade.status == TradeStatus.CLOSED:
+                closed_profit[trade.magic_number] += trade.profit
         
-        # Calculate statistics
+        # Calculate statistics (closed and cancelled trades only live in history)
         total_active = len(all_active)
-        total_closed = len([t for t in all_history if t.status == TradeStatus.CLOSED])
-        total_cancelled = len([t for t in all_history if t.status == TradeStatus.CANCELLED])
+        total_closed = total_cancelled = 0
         
         # Group by EA
         ea_stats = {}
-        for trade in all_active + all_history:
-            magic = trade.magic_number
-            if magic not in ea_stats:
-                ea_stats[magic] = {
+        for (magic, status), count in status_counts.items():
+            stats = ea_stats.get(magic)
+            if stats is None:
+                stats = ea_stats[magic] = {
                     'active': 0,
                     'closed': 0,
                     'cancelled': 0,
-                    'total_profit': 0.0
+                    'total_profit': closed_profit[magic]
                 }
             
-            if trade.status == TradeStatus.FILLED or trade.status == TradeStatus.PENDING:
-                ea_stats[magic]['active'] += 1
-            elif trade.status == TradeStatus.CLOSED:
-                ea_stats[magic]['closed'] += 1
-                ea_stats[magic]['total_profit'] += trade.profit
-            elif trade.status == TradeStatus.CANCELLED:
-                ea_stats[magic]['cancelled'] += 1
+            if status == TradeStatus.FILLED or status == TradeStatus.PENDING:
+                stats['active'] += count
+            elif status == TradeStatus.CLOSED:
+                stats['closed'] += count
+                total_closed += count
+            elif status == TradeStatus.CANCELLED:
+                stats['cancelled'] += count
+                total_cancelled += count
         
         # Get EA information
         registered_eas = trade_service.get_all_eas()
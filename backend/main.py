@@ -68,6 +68,12 @@ app.add_middleware(
 async def startup_event():
     """Initialize database and services on startup"""
     print("Initializing MT5 COC Dashboard Backend...")
+    
+    # Run new tasks eagerly up to their first await, so fire-and-forget
+    # broadcasts skip a scheduler round trip (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+    
     try:
         # Initialize database
         init_database()
@@ -96,6 +102,17 @@ async def startup_event():
     print(f" API documentation available at: {get_docs_url()}")
     print(" All configuration loaded from central config.json")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Flush queued trade records before exit"""
+    try:
+        from backend.services import trade_recording_service
+    except ImportError:
+        from services import trade_recording_service
+
+    if trade_recording_service._trade_recording_service is not None:
+        await trade_recording_service._trade_recording_service.close()
+
 @app.options("/{path:path}")
 async def options_handler(path: str):
     """Handle all OPTIONS requests explicitly"""
@@ -203,5 +220,6 @@ if __name__ == "__main__":
         host=host,
         port=port,
         reload=reload,
+        loop="auto",  # uses uvloop when installed
         log_level="info"
     )
\ No newline at end of file
@@ -0,0 +1,62 @@
+"""
+Trade Analytics Kernels
+
+Single-pass reductions over the columnar trade history used by the trade
+recording service. Compiled with Numba when it is installed, otherwise
+computed with vectorized NumPy.
+"""
+
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:  # pragma: no cover - optional dependency
+    njit = None
+
+
+if njit is not None:
+
+    @njit(cache=True, fastmath=True, boundscheck=False)
+    def ea_stats(magic, status, profit, target_magic, closed_code):
+        """Closed-trade totals for one EA in a single pass over the columns"""
+        total = gross_profit = gross_loss = 0.0
+        wins = losses = count = 0
+        largest = -1e308
+        smallest = 1e308
+        for i in range(magic.shape[0]):
+            if magic[i] == target_magic and status[i] == closed_code:
+                p = profit[i]
+                total += p
+                count += 1
+                if p > 0:
+                    gross_profit += p
+                    wins += 1
+                elif p < 0:
+                    gross_loss -= p
+                    losses += 1
+                if p > largest:
+                    largest = p
+                if p < smallest:
+                    smallest = p
+        return total, gross_profit, gross_loss, wins, losses, count, largest, smallest
+
+else:
+
+    def ea_stats(magic: np.ndarray, status: np.ndarray, profit: np.ndarray,
+                 target_magic: int, closed_code: int) -> Tuple[float, float, float, int, int, int, float, float]:
+        """Closed-trade totals for one EA using masked NumPy reductions"""
+        profits = profit[(magic == target_magic) & (status == closed_code)]
+        wins = profits[profits > 0]
+        losses = profits[profits < 0]
+        return (
+            float(profits.sum()),
+            float(wins.sum()),
+            -float(losses.sum()),
+            len(wins),
+            len(losses),
+            len(profits),
+            float(profits.max(initial=-1e308)),
+            float(profits.min(initial=1e308))
+        )
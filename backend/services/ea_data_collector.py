@@ -11,6 +11,7 @@ This module provides the EADataCollector class and related services for:
 import asyncio
 import logging
 import statistics
+from collections import defaultdict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass
@@ -667,52 +668,100 @@ class PortfolioAggregator:
                         last_updated=datetime.now()
                     )
                 
-                # Get all trades for active EAs
-                ea_ids = [ea.id for ea in active_eas]
-                all_trades = session.query(Trade).filter(
-                    Trade.ea_id.in_(ea_ids),
-                    Trade.close_time.isnot(None)
-                ).all()
-                
-                # Calculate aggregated metrics
-                total_profit = sum(t.profit for t in all_trades)
-                profit_factor = self.calculator.calculate_profit_factor(all_trades)
-                expected_payoff = self.calculator.calculate_expected_payoff(all_trades)
-                win_rate = self.calculator.calculate_win_rate(all_trades)
-                
-                # Calculate portfolio drawdown (max drawdown across all EAs)
-                max_drawdown = 0.0
-                for ea in active_eas:
-                    ea_trades = [t for t in all_trades if t.ea_id == ea.id]
-                    if ea_trades:
-                        ea_drawdown = self.calculator.calculate_drawdown(ea_trades)
-                        max_drawdown = max(max_drawdown, ea_drawdown)
-                
-                # Get unique symbols and strategies
-                symbols = list(set(ea.symbol for ea in active_eas))
-                strategies = list(set(ea.strategy_tag for ea in active_eas))
+                trades_by_ea = self._load_closed_trades(session, active_eas)
                 
                 # Get total EA count (including inactive)
                 total_ea_count = session.query(EA).count()
                 
-                return PortfolioMetrics(
-                    total_profit=round(total_profit, 2),
-                    total_drawdown=round(max_drawdown, 2),
-                    win_rate=round(win_rate, 2),
-                    total_trades=len(all_trades),
-                    active_eas=len(active_eas),
-                    total_eas=total_ea_count,
-                    profit_factor=round(profit_factor, 4),
-                    expected_payoff=round(expected_payoff, 4),
-                    symbols=sorted(symbols),
-                    strategies=sorted(strategies),
-                    last_updated=datetime.now()
-                )
+                return self._aggregate_metrics(active_eas, trades_by_ea, total_ea_count)
                 
         except Exception as e:
             logger.error(f"Error calculating portfolio metrics: {e}")
             raise
     
+    @staticmethod
+    def _load_closed_trades(session: Session, eas: List[EA]) -> Dict[int, List[Trade]]:
+        """Fetch closed trades for the given EAs, grouped by EA id"""
+        trades_by_ea = defaultdict(list)
+        all_trades = session.query(Trade).filter(
+            Trade.ea_id.in_([ea.id for ea in eas]),
+            Trade.close_time.isnot(None)
+        ).all()
+        
+        for trade in all_trades:
+            trades_by_ea[trade.ea_id].append(trade)
+        
+        return trades_by_ea
+    
+    def _aggregate_metrics(self, active_eas: List[EA], trades_by_ea: Dict[int, List[Trade]],
+                           total_ea_count: int) -> PortfolioMetrics:
+        """Fold portfolio metrics for a set of active EAs from their grouped trades"""
+        total_profit = closed_profit = gross_profit = gross_loss = 0.0
+        total_trades = closed_count = winning_count = 0
+        max_drawdown = 0.0
+        
+        for ea in active_eas:
+            ea_trades = trades_by_ea.get(ea.id)
+            if not ea_trades:
+                continue
+            
+            total_trades += len(ea_trades)
+            for trade in ea_trades:
+                profit = trade.profit
+                total_profit += profit
+                
+                if trade.is_closed:
+                    closed_count += 1
+                    closed_profit += profit
+                    if profit > 0:
+                        gross_profit += profit
+                        winning_count += 1
+                    elif profit < 0:
+                        gross_loss -= profit
+            
+            # Portfolio drawdown is the max drawdown across all EAs
+            max_drawdown = max(max_drawdown, self.calculator.calculate_drawdown(ea_trades))
+        
+        # Same formulas as PerformanceCalculator, from the folded totals
+        if closed_count:
+            if gross_loss == 0:
+                profit_factor = gross_profit if gross_profit > 0 else 0.0
+            else:
+                profit_factor = round(gross_profit / gross_loss, 4)
+            expected_payoff = round(closed_profit / closed_count, 4)
+            win_rate = round(winning_count / closed_count * 100, 2)
+        else:
+            profit_factor = expected_payoff = win_rate = 0.0
+        
+        # Get unique symbols and strategies
+        symbols = set(ea.symbol for ea in active_eas)
+        strategies = set(ea.strategy_tag for ea in active_eas)
+        
+        return PortfolioMetrics(
+            total_profit=round(total_profit, 2),
+            total_drawdown=round(max_drawdown, 2),
+            win_rate=round(win_rate, 2),
+            total_trades=total_trades,
+            active_eas=len(active_eas),
+            total_eas=total_ea_count,
+            profit_factor=round(profit_factor, 4),
+            expected_payoff=round(expected_payoff, 4),
+            symbols=sorted(symbols),
+            strategies=sorted(strategies),
+            last_updated=datetime.now()
+        )
+    
+    @staticmethod
+    def _breakdown_entry(metrics: PortfolioMetrics) -> Dict[str, Any]:
+        """Subset of portfolio metrics reported per symbol or strategy"""
+        return {
+            'total_profit': metrics.total_profit,
+            'profit_factor': metrics.profit_factor,
+            'win_rate': metrics.win_rate,
+            'active_eas': metrics.active_eas,
+            'total_trades': metrics.total_trades
+        }
+    
     async def get_performance_breakdown(self) -> Dict[str, Any]:
         """
         Get detailed performance breakdown by symbol and strategy
@@ -722,33 +771,33 @@ class PortfolioAggregator:
         """
         try:
             with get_db_session() as session:
+                # Load active EAs and their trades once and slice them per
+                # symbol and strategy, instead of re-querying for each group
+                active_eas = session.query(EA).filter(EA.status == 'active').all()
+                trades_by_ea = self._load_closed_trades(session, active_eas) if active_eas else {}
+                total_ea_count = session.query(EA).count()
+                
                 # Get performance by symbol
                 symbol_performance = {}
                 symbols = session.query(EA.symbol).distinct().all()
                 
                 for (symbol,) in symbols:
-                    symbol_metrics = await self.calculate_portfolio_metrics(symbol_filter=symbol)
-                    symbol_performance[symbol] = {
-                        'total_profit': symbol_metrics.total_profit,
-                        'profit_factor': symbol_metrics.profit_factor,
-                        'win_rate': symbol_metrics.win_rate,
-                        'active_eas': symbol_metrics.active_eas,
-                        'total_trades': symbol_metrics.total_trades
-                    }
+                    symbol_eas = [ea for ea in active_eas if ea.symbol == symbol] if symbol else active_eas
+                    symbol_metrics = self._aggregate_metrics(symbol_eas, trades_by_ea, total_ea_count)
+                    symbol_performance[symbol] = self._breakdown_entry(symbol_metrics)
                 
-                # Get performance by strategy
+                # Get performance by strategy (substring match, like the SQL LIKE filter)
                 strategy_performance = {}
                 strategies = session.query(EA.strategy_tag).distinct().all()
                 
                 for (strategy,) in strategies:
-                    strategy_metrics = await self.calculate_portfolio_metrics(strategy_filter=strategy)
-                    strategy_performance[strategy] = {
-                        'total_profit': strategy_metrics.total_profit,
-                        'profit_factor': strategy_metrics.profit_factor,
-                        'win_rate': strategy_metrics.win_rate,
-                        'active_eas': strategy_metrics.active_eas,
-                        'total_trades': strategy_metrics.total_trades
-                    }
+                    if strategy:
+                        needle = strategy.lower()
+                        strategy_eas = [ea for ea in active_eas if needle in (ea.strategy_tag or '').lower()]
+                    else:
+                        strategy_eas = active_eas
+                    strategy_metrics = self._aggregate_metrics(strategy_eas, trades_by_ea, total_ea_count)
+                    strategy_performance[strategy] = self._breakdown_entry(strategy_metrics)
                 
                 return {
                     'by_symbol': symbol_performance,
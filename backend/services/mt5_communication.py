@@ -14,9 +14,18 @@ from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, asdict
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
+# EA reports are decoded with orjson when installed; orjson.JSONDecodeError
+# subclasses json.JSONDecodeError, so existing error handling still applies
+_loads = orjson.loads if orjson is not None else json.loads
+
 
 @dataclass
 class SoldierReport:
@@ -306,7 +315,7 @@ class MT5DataParser:
             
             # Parse JSON data
             try:
-                data = json.loads(raw_data)
+                data = _loads(raw_data)
             except json.JSONDecodeError as e:
                 logger.error(f"Invalid JSON data for EA {magic_number}: {e}")
                 return None
@@ -372,19 +381,19 @@ class MT5DataParser:
             
             # JSON fields - module_status
             if isinstance(data['module_status'], str):
-                validated_data['module_status'] = json.loads(data['module_status'])
+                validated_data['module_status'] = _loads(data['module_status'])
             else:
                 validated_data['module_status'] = data['module_status']
             
             # JSON fields - performance_metrics
             if isinstance(data['performance_metrics'], str):
-                validated_data['performance_metrics'] = json.loads(data['performance_metrics'])
+                validated_data['performance_metrics'] = _loads(data['performance_metrics'])
             else:
                 validated_data['performance_metrics'] = data['performance_metrics']
             
             # JSON fields - last_trades
             if isinstance(data['last_trades'], str):
-                validated_data['last_trades'] = json.loads(data['last_trades'])
+                validated_data['last_trades'] = _loads(data['last_trades'])
             else:
                 validated_data['last_trades'] = data['last_trades']
             
@@ -446,7 +455,7 @@ class MT5DataParser:
             True if format is valid
         """
         try:
-            data = json.loads(data_string)
+            data = _loads(data_string)
             
             # Check required fields exist
             required_fields = [
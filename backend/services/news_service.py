@@ -688,6 +688,9 @@ class NewsEventScheduler:
                 end_time=end_time
             )
             
+            # One reference time for the whole pass
+            current_time = start_time
+            
             alerts = []
             for event in high_impact_events:  # event is already a dictionary
                 # Parse datetime strings if needed
@@ -695,8 +698,6 @@ class NewsEventScheduler:
                     blackout_start = datetime.fromisoformat(event['blackout_start'].replace('Z', '+00:00')) if isinstance(event['blackout_start'], str) else event['blackout_start']
                     blackout_end = datetime.fromisoformat(event['blackout_end'].replace('Z', '+00:00')) if isinstance(event['blackout_end'], str) else event['blackout_end']
                     
-                    current_time = datetime.now()
-                    
                     if blackout_start <= current_time <= blackout_end:
                         alerts.append({
                             'type': 'ACTIVE_BLACKOUT',
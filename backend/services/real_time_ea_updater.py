@@ -30,6 +30,29 @@ except ImportError:
 
 logger = logging.getLogger(__name__)
 
+# Key layout and zeroed counters shared by every detected EA entry
+_EA_ENTRY_TEMPLATE = {
+    'magic_number': None,
+    'symbol': None,
+    'current_profit': 0.0,
+    'open_positions': 0,
+    'pending_orders': 0,
+    'positions': None,
+    'orders': None,
+    'last_update': None
+}
+
+def _new_ea_entry(magic: int, symbol: str, last_update: str, **extra) -> Dict:
+    """Copy the EA entry template with fresh position/order lists"""
+    entry = _EA_ENTRY_TEMPLATE.copy()
+    entry['magic_number'] = magic
+    entry['symbol'] = symbol
+    entry['positions'] = []
+    entry['orders'] = []
+    entry['last_update'] = last_update
+    entry.update(extra)
+    return entry
+
 class RealTimeEAUpdater:
     """Service for real-time EA data updates from MT5"""
     
@@ -46,6 +69,9 @@ class RealTimeEAUpdater:
         self.websocket_server = None
         self.last_ea_data = {}
         
+        # Set to run the next update cycle early; created in the running loop
+        self._wakeup: Optional[asyncio.Event] = None
+        
         if WEBSOCKET_AVAILABLE:
             self.websocket_server = get_websocket_server()
     
@@ -76,20 +102,35 @@ class RealTimeEAUpdater:
             return
         
         self.running = True
+        self._wakeup = asyncio.Event()
         logger.info(f"Starting real-time EA updates (interval: {self.update_interval}s)")
         
         try:
             while self.running:
                 await self.update_ea_data()
-                await asyncio.sleep(self.update_interval)
+                await self._wait_for_next_update()
         except Exception as e:
             logger.error(f"Error in update loop: {e}")
         finally:
             self.running = False
     
+    async def _wait_for_next_update(self):
+        """Sleep until the update interval elapses or an update is requested"""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout=self.update_interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+    
+    def request_update(self):
+        """Run the next update cycle now instead of waiting for the interval"""
+        if self._wakeup is not None:
+            self._wakeup.set()
+    
     async def stop_updates(self):
         """Stop the update loop"""
         self.running = False
+        self.request_update()
         
         if self.mt5_connected:
             try:
@@ -140,26 +181,22 @@ class RealTimeEAUpdater:
             # Group by magic number
             ea_data = {}
             
+            # One timestamp for every EA detected in this pass
+            now_iso = datetime.now().isoformat()
+            
             # Process positions
             for position in positions:
                 if position.magic != 0:  # Skip manual trades
                     magic = position.magic
-                    if magic not in ea_data:
-                        ea_data[magic] = {
-                            'magic_number': magic,
-                            'symbol': position.symbol,
-                            'current_profit': 0.0,
-                            'open_positions': 0,
-                            'pending_orders': 0,
-                            'positions': [],
-                            'orders': [],
-                            'last_update': datetime.now().isoformat(),
-                            'detection_method': 'active_position'
-                        }
+                    entry = ea_data.get(magic)
+                    if entry is None:
+                        entry = ea_data[magic] = _new_ea_entry(
+                            magic, position.symbol, now_iso, detection_method='active_position'
+                        )
                     
-                    ea_data[magic]['current_profit'] += position.profit + position.swap
-                    ea_data[magic]['open_positions'] += 1
-                    ea_data[magic]['positions'].append({
+                    entry['current_profit'] += position.profit + position.swap
+                    entry['open_positions'] += 1
+                    entry['positions'].append({
                         'ticket': position.ticket,
                         'type': 'buy' if position.type == 0 else 'sell',
                         'volume': position.volume,
@@ -173,21 +210,14 @@ class RealTimeEAUpdater:
             for order in orders:
                 if order.magic != 0:  # Skip manual orders
                     magic = order.magic
-                    if magic not in ea_data:
-                        ea_data[magic] = {
-                            'magic_number': magic,
-                            'symbol': order.symbol,
-                            'current_profit': 0.0,
-                            'open_positions': 0,
-                            'pending_orders': 0,
-                            'positions': [],
-                            'orders': [],
-                            'last_update': datetime.now().isoformat(),
-                            'detection_method': 'pending_order'
-                        }
+                    entry = ea_data.get(magic)
+                    if entry is None:
+                        entry = ea_data[magic] = _new_ea_entry(
+                            magic, order.symbol, now_iso, detection_method='pending_order'
+                        )
                     
-                    ea_data[magic]['pending_orders'] += 1
-                    ea_data[magic]['orders'].append({
+                    entry['pending_orders'] += 1
+                    entry['orders'].append({
                         'ticket': order.ticket,
                         'type': order.type,
                         'volume': order.volume_initial,
@@ -231,6 +261,7 @@ class RealTimeEAUpdater:
             # Get deals from last 1 hour to find recently active EAs
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=1)
+            now_iso = end_time.isoformat()
             
             deals = mt5.history_deals_get(start_time, end_time)
             if deals is None:
@@ -240,17 +271,10 @@ class RealTimeEAUpdater:
             for deal in deals:
                 if deal.magic != 0 and deal.magic not in ea_data:
                     # This EA was recently active but has no current positions/orders
-                    ea_data[deal.magic] = {
-                        'magic_number': deal.magic,
-                        'symbol': deal.symbol,
-                        'current_profit': 0.0,
-                        'open_positions': 0,
-                        'pending_orders': 0,
-                        'positions': [],
-                        'orders': [],
-                        'last_update': datetime.now().isoformat(),
-                        'status': 'recently_active'  # Mark as recently active
-                    }
+                    ea_data[deal.magic] = _new_ea_entry(
+                        deal.magic, deal.symbol, now_iso,
+                        status='recently_active'  # Mark as recently active
+                    )
                     
                     logger.info(f"Found recently active EA {deal.magic} on {deal.symbol}")
         
@@ -298,6 +322,7 @@ class RealTimeEAUpdater:
             # Check last 24 hours for any EA activity
             end_time = datetime.now()
             start_time = end_time - timedelta(hours=24)
+            now_iso = end_time.isoformat()
             
             deals = mt5.history_deals_get(start_time, end_time)
             if deals is None:
@@ -307,19 +332,12 @@ class RealTimeEAUpdater:
             for deal in deals:
                 if deal.magic != 0 and deal.magic not in ea_data:
                     # This EA was active in the last 24 hours but has no current activity
-                    ea_data[deal.magic] = {
-                        'magic_number': deal.magic,
-                        'symbol': deal.symbol,
-                        'current_profit': 0.0,
-                        'open_positions': 0,
-                        'pending_orders': 0,
-                        'positions': [],
-                        'orders': [],
-                        'last_update': datetime.now().isoformat(),
-                        'detection_method': 'recent_history_24h',
-                        'status': 'dormant',
-                        'last_trade_time': deal.time.isoformat() if hasattr(deal.time, 'isoformat') else str(deal.time)
-                    }
+                    ea_data[deal.magic] = _new_ea_entry(
+                        deal.magic, deal.symbol, now_iso,
+                        detection_method='recent_history_24h',
+                        status='dormant',
+                        last_trade_time=deal.time.isoformat() if hasattr(deal.time, 'isoformat') else str(deal.time)
+                    )
                     
                     logger.info(f"Found dormant EA {deal.magic} on {deal.symbol} (last trade: {deal.time})")
         
@@ -360,6 +378,9 @@ class RealTimeEAUpdater:
             from pathlib import Path
             import json
             
+            # Fallback timestamp for files that do not carry their own
+            now_iso = datetime.now().isoformat()
+            
             # Check MT5 globals directory
             globals_dir = Path("data/mt5_globals")
             if globals_dir.exists():
@@ -377,18 +398,13 @@ class RealTimeEAUpdater:
                                 content = file_path.read_text()
                                 ea_file_data = json.loads(content)
                                 
-                                ea_data[magic] = {
-                                    'magic_number': magic,
-                                    'symbol': ea_file_data.get('symbol', 'UNKNOWN'),
-                                    'current_profit': ea_file_data.get('current_profit', 0.0),
-                                    'open_positions': ea_file_data.get('open_positions', 0),
-                                    'pending_orders': 0,
-                                    'positions': [],
-                                    'orders': [],
-                                    'last_update': ea_file_data.get('last_update', datetime.now().isoformat()),
-                                    'detection_method': 'file_based_globals',
-                                    'status': 'file_communication'
-                                }
+                                ea_data[magic] = _new_ea_entry(
+                                    magic, ea_file_data.get('symbol', 'UNKNOWN'), ea_file_data.get('last_update', now_iso),
+                                    current_profit=ea_file_data.get('current_profit', 0.0),
+                                    open_positions=ea_file_data.get('open_positions', 0),
+                                    detection_method='file_based_globals',
+                                    status='file_communication'
+                                )
                                 
                                 logger.info(f"Found file-based EA {magic} on {ea_data[magic]['symbol']}")
                     
@@ -410,18 +426,13 @@ class RealTimeEAUpdater:
                             content = file_path.read_text()
                             ea_file_data = json.loads(content)
                             
-                            ea_data[magic] = {
-                                'magic_number': magic,
-                                'symbol': ea_file_data.get('symbol', 'UNKNOWN'),
-                                'current_profit': ea_file_data.get('current_profit', 0.0),
-                                'open_positions': ea_file_data.get('open_positions', 0),
-                                'pending_orders': 0,
-                                'positions': [],
-                                'orders': [],
-                                'last_update': ea_file_data.get('last_update', datetime.now().isoformat()),
-                                'detection_method': 'file_based_fallback',
-                                'status': 'file_communication'
-                            }
+                            ea_data[magic] = _new_ea_entry(
+                                magic, ea_file_data.get('symbol', 'UNKNOWN'), ea_file_data.get('last_update', now_iso),
+                                current_profit=ea_file_data.get('current_profit', 0.0),
+                                open_positions=ea_file_data.get('open_positions', 0),
+                                detection_method='file_based_fallback',
+                                status='file_communication'
+                            )
                             
                             logger.info(f"Found fallback EA {magic} on {ea_data[magic]['symbol']}")
                     
@@ -590,45 +601,57 @@ class RealTimeEAUpdater:
     async def broadcast_changes(self, current_data: Dict[int, Dict]):
         """Broadcast EA data changes via WebSocket"""
         try:
-            if not self.websocket_server:
+            # Nobody is watching; skip building the change set entirely
+            if not self.websocket_server or not self.websocket_server.has_clients:
+                return
+            
+            # Idle: no EAs now or last cycle, so there is nothing to report
+            if not current_data and not self.last_ea_data:
                 return
             
             # Check for changes
             changes = []
             
+            last_ea_data = self.last_ea_data
+            
             for magic_number, data in current_data.items():
-                last_data = self.last_ea_data.get(magic_number, {})
+                # Read each field once per EA
+                last_get = last_ea_data.get(magic_number, {}).get
+                profit = data['current_profit']
+                positions = data['open_positions']
+                old_profit = last_get('current_profit', 0)
+                old_positions = last_get('open_positions', 0)
                 
                 # Check if profit changed
-                if data['current_profit'] != last_data.get('current_profit', 0):
+                if profit != old_profit:
                     changes.append({
                         'type': 'ea_profit_update',
                         'magic_number': magic_number,
                         'symbol': data['symbol'],
-                        'old_profit': last_data.get('current_profit', 0),
-                        'new_profit': data['current_profit'],
-                        'change': data['current_profit'] - last_data.get('current_profit', 0)
+                        'old_profit': old_profit,
+                        'new_profit': profit,
+                        'change': profit - old_profit
                     })
                 
                 # Check if positions changed
-                if data['open_positions'] != last_data.get('open_positions', 0):
+                if positions != old_positions:
                     changes.append({
                         'type': 'ea_positions_update',
                         'magic_number': magic_number,
                         'symbol': data['symbol'],
-                        'old_positions': last_data.get('open_positions', 0),
-                        'new_positions': data['open_positions']
+                        'old_positions': old_positions,
+                        'new_positions': positions
                     })
             
             # Check for new EAs
-            for magic_number in current_data:
-                if magic_number not in self.last_ea_data:
+            for magic_number, data in current_data.items():
+                if magic_number not in last_ea_data:
                     changes.append({
                         'type': 'ea_connected',
                         'magic_number': magic_number,
-                        'symbol': current_data[magic_number]['symbol'],
-                        'current_profit': current_data[magic_number]['current_profit'],
-                        'open_positions': current_data[magic_number]['open_positions']
+                        'symbol': data['symbol'],
+                        'current_profit': data['current_profit'],
+                        'open_positions': data['open_positions']
                     })
             
             # Check for disconnected EAs
@@ -640,11 +663,14 @@ class RealTimeEAUpdater:
                         'symbol': self.last_ea_data[magic_number]['symbol']
                     })
             
+            # Both messages of this tick share one timestamp
+            timestamp = datetime.now().isoformat()
+            
             # Broadcast changes
             if changes:
                 await self.websocket_server.broadcast_to_authenticated({
                     'type': 'ea_updates',
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': timestamp,
                     'changes': changes
                 })
                 
@@ -653,7 +679,7 @@ class RealTimeEAUpdater:
             # Always broadcast current status
             await self.websocket_server.broadcast_to_authenticated({
                 'type': 'ea_status_update',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': timestamp,
                 'eas': list(current_data.values())
             })
             
@@ -702,4 +728,10 @@ def get_ea_updater() -> RealTimeEAUpdater:
     global _ea_updater
     if _ea_updater is None:
         _ea_updater = RealTimeEAUpdater()
-    return _ea_updater
\ No newline at end of file
+    return _ea_updater
+
+
+def request_ea_update():
+    """Ask the EA updater, if one exists, to run its next cycle now"""
+    if _ea_updater is not None:
+        _ea_updater.request_update()
\ No newline at end of file
@@ -7,132 +7,419 @@ and testing purposes.
 
 import asyncio
 import logging
+import os
+import queue
 import signal
 import sys
-from typing import Optional
+import threading
+from dataclasses import dataclass, replace
+from logging.handlers import QueueHandler, QueueListener
+from typing import TYPE_CHECKING, List, Optional
 
 try:
     from .websocket_server import WebSocketServer
-    from .websocket_integration_example import DashboardIntegrationService
 except ImportError:
     # Fallback for direct execution
     from websocket_server import WebSocketServer
-    from websocket_integration_example import DashboardIntegrationService
 
+if TYPE_CHECKING:
+    from .websocket_integration_example import DashboardIntegrationService
+
+logger = logging.getLogger(__name__)
 
 # Global server instance for cleanup
 server_instance: Optional[WebSocketServer] = None
-integration_service: Optional[DashboardIntegrationService] = None
+integration_service: Optional["DashboardIntegrationService"] = None
+shutdown_event: Optional[asyncio.Event] = None
 
+# Shutdown guard so repeated signals share a single cleanup
+_shutting_down = False
+_shutdown_task: Optional[asyncio.Task] = None
 
-def signal_handler(signum, frame):
-    """Handle shutdown signals"""
-    print(f"\nReceived signal {signum}, shutting down gracefully...")
-    if server_instance:
-        asyncio.create_task(cleanup())
+# Seconds cleanup may take before the process is force-exited
+_shutdown_timeout: float = 10.0
 
+# Writes log records on a background thread so the event loop never blocks on I/O
+_log_listener: Optional[QueueListener] = None
 
-async def cleanup():
-    """Cleanup resources on shutdown"""
+
+def _request_shutdown() -> asyncio.Task:
+    """Start cleanup once; later callers get the same task"""
+    global _shutting_down, _shutdown_task
+    
+    if not _shutting_down:
+        _shutting_down = True
+        _shutdown_task = asyncio.get_running_loop().create_task(cleanup())
+    
+    return _shutdown_task
+
+
+def _trigger_shutdown(signum: int):
+    """Handle shutdown signals on the event loop"""
+    if _shutting_down:
+        return
+    
+    logger.info(f"Received signal {signum}, shutting down gracefully...")
+    _request_shutdown()
+
+
+def _install_signal_handlers(lifetime_event: asyncio.Event):
+    """Register SIGINT/SIGTERM handlers that release the given lifetime event"""
+    global shutdown_event
+    
+    loop = asyncio.get_running_loop()
+    shutdown_event = lifetime_event
+    
+    if sys.platform == "win32":
+        # No add_signal_handler on Windows; Ctrl+C surfaces as KeyboardInterrupt in main()
+        return
+    
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, _trigger_shutdown, sig)
+        except NotImplementedError:
+            # Loop without signal support; rely on the KeyboardInterrupt path
+            break
+
+
+async def _do_cleanup():
+    """Stop integration and WebSocket services"""
     global server_instance, integration_service
     
     try:
         if integration_service:
             await integration_service.stop()
-            print("Integration service stopped")
+            logger.info("Integration service stopped")
         
         if server_instance:
             await server_instance.stop_server()
-            print("WebSocket server stopped")
+            logger.info("WebSocket server stopped")
     
     except Exception as e:
-        print(f"Error during cleanup: {e}")
+        logger.error(f"Error during cleanup: {e}")
+    finally:
+        if shutdown_event is not None:
+            shutdown_event.set()
+
+
+def _configure_logging(level: int):
+    """Route root logging through a queue drained by a listener thread"""
+    global _log_listener
+    
+    logging.basicConfig(
+        level=level,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     
-    # Exit the event loop
-    loop = asyncio.get_event_loop()
-    loop.stop()
+    root = logging.getLogger()
+    handlers = root.handlers[:]
+    for handler in handlers:
+        root.removeHandler(handler)
+    
+    log_queue = queue.SimpleQueue()
+    root.addHandler(QueueHandler(log_queue))
+    _log_listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+
+
+def _start_log_listener():
+    """Start the log listener thread in this process"""
+    if _log_listener is not None:
+        _log_listener.start()
+
+
+def _stop_log_listener():
+    """Drain queued log records and stop the listener thread"""
+    global _log_listener
+    
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 
-async def start_websocket_server_only(host: str = None, port: int = None, auth_token: str = "dashboard_token"):
+def _force_exit():
+    """Watchdog fired: cleanup is stuck, exit without further teardown"""
+    logger.error(f"Shutdown did not finish within {_shutdown_timeout}s, forcing exit")
+    _stop_log_listener()
+    logging.shutdown()
+    os._exit(1)
+
+
+async def cleanup():
+    """Cleanup resources on shutdown, shielded from loop teardown cancellation"""
+    # A daemon thread rather than a loop timer: if cleanup is cancelled the loop
+    # closes, and a call_later watchdog would never fire
+    watchdog = threading.Timer(_shutdown_timeout, _force_exit)
+    watchdog.daemon = True
+    watchdog.start()
+    
     try:
-        from backend.config.urls import WS_HOST, WS_PORT
-    except ImportError:
-        from config.urls import WS_HOST, WS_PORT
+        await asyncio.shield(_do_cleanup())
+        watchdog.cancel()
+    except asyncio.CancelledError:
+        logger.warning("Cleanup cancelled during shutdown; services are still stopping")
+        raise
+
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Resolved startup configuration shared by both entry points"""
+    host: Optional[str] = None
+    port: Optional[int] = None
+    auth_token: str = "dashboard_token"
+    integrated: bool = False
+    batch_window_ms: int = 0
+    batch_max_bytes: int = 64 * 1024
+    writer_limit: int = 2 ** 20
+    max_queue: int = 32
+    workers: int = 1
+    reuse_port: bool = False
+    json_backend: str = "orjson"
+    prepared_cache_mb: int = 0
+    shutdown_timeout: float = 10.0
+    tcp_nodelay: bool = True
+    tcp_keepalive: bool = True
+    compression: bool = False
+    
+    @classmethod
+    def from_args(cls, args) -> "ServerConfig":
+        """Build the config from parsed command line arguments"""
+        return cls(
+            host=args.host,
+            port=args.port,
+            auth_token=args.auth_token,
+            integrated=args.integrated,
+            batch_window_ms=args.batch_window_ms,
+            batch_max_bytes=args.batch_max_bytes,
+            writer_limit=args.writer_limit,
+            max_queue=args.max_queue,
+            workers=args.workers,
+            json_backend=args.json,
+            prepared_cache_mb=args.prepared_cache_mb,
+            shutdown_timeout=args.shutdown_timeout,
+            tcp_nodelay=args.nodelay,
+            tcp_keepalive=args.keepalive,
+            compression=args.compression,
+        )
+    
+    def validate(self) -> List[str]:
+        """Return a list of problems with the configuration"""
+        errors = []
+        if self.port is not None and not 0 < self.port < 65536:
+            errors.append(f"port must be between 1 and 65535, got {self.port}")
+        if self.workers < 1:
+            errors.append(f"workers must be at least 1, got {self.workers}")
+        if self.batch_window_ms < 0:
+            errors.append("batch window must not be negative")
+        if self.batch_max_bytes <= 0 or self.writer_limit <= 0 or self.max_queue <= 0:
+            errors.append("batch max bytes, writer limit and max queue must be positive")
+        if self.prepared_cache_mb < 0:
+            errors.append("prepared cache size must not be negative")
+        if self.shutdown_timeout <= 0:
+            errors.append("shutdown timeout must be positive")
+        return errors
     
-    host = host or WS_HOST
-    port = port or WS_PORT
+    def resolved(self) -> "ServerConfig":
+        """Fill in host/port from the URL configuration when unset"""
+        if self.host and self.port:
+            return self
+        
+        try:
+            from backend.config.urls import WS_HOST, WS_PORT
+        except ImportError:
+            from config.urls import WS_HOST, WS_PORT
+        
+        return replace(self, host=self.host or WS_HOST, port=self.port or WS_PORT)
+
+
+def _use_eager_tasks():
+    """Run new tasks eagerly up to their first await (Python 3.12+)"""
+    # Broadcast and monitor tasks that finish without suspending skip a
+    # scheduler round trip
+    if hasattr(asyncio, "eager_task_factory"):
+        asyncio.get_running_loop().set_task_factory(asyncio.eager_task_factory)
+
+
+def _create_server(config: ServerConfig) -> WebSocketServer:
+    """Create the WebSocket server from a resolved config"""
+    return WebSocketServer(
+        host=config.host,
+        port=config.port,
+        auth_token=config.auth_token,
+        batch_window_ms=config.batch_window_ms,
+        batch_max_bytes=config.batch_max_bytes,
+        writer_limit=config.writer_limit,
+        max_queue=config.max_queue,
+        reuse_port=config.reuse_port,
+        json_backend=config.json_backend,
+        prepared_cache_mb=config.prepared_cache_mb,
+        tcp_nodelay=config.tcp_nodelay,
+        tcp_keepalive=config.tcp_keepalive,
+        compression=config.compression,
+    )
+
+
+async def start_websocket_server_only(host: str = None, port: int = None, auth_token: str = "dashboard_token",
+                                      config: Optional[ServerConfig] = None):
     """Start only the WebSocket server without integration services"""
-    global server_instance
+    global server_instance, _shutdown_timeout
+    
+    config = (config or ServerConfig(host=host, port=port, auth_token=auth_token)).resolved()
+    _shutdown_timeout = config.shutdown_timeout
+    _use_eager_tasks()
     
     try:
-        server_instance = WebSocketServer(host=host, port=port, auth_token=auth_token)
-        await server_instance.start_server()
+        server_instance = _create_server(config)
+        server_task = asyncio.create_task(server_instance.start_server())
+        _install_signal_handlers(server_instance.stopped_event)
         
-        print(f"WebSocket server started successfully!")
-        print(f"Server: ws://{host}:{port}")
-        print(f"Auth token: {auth_token}")
-        print("Press Ctrl+C to stop the server")
+        logger.info("WebSocket server started successfully!")
+        logger.info(f"Server: ws://{config.host}:{config.port}")
+        logger.info(f"Auth token: {config.auth_token}")
+        logger.info("Press Ctrl+C to stop the server")
         
-        # Keep the server running
-        while server_instance.running:
-            await asyncio.sleep(1)
-            
-    except KeyboardInterrupt:
-        print("\nShutdown requested by user")
+        # Keep the server running until a shutdown signal arrives or the server stops
+        await server_instance.stopped_event.wait()
+        if server_task.done():
+            server_task.result()
+        
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("Shutdown requested by user")
+        raise
     except Exception as e:
-        print(f"Error starting WebSocket server: {e}")
+        logger.error(f"Error starting WebSocket server: {e}")
         sys.exit(1)
     finally:
-        await cleanup()
+        await _request_shutdown()
 
 
-async def start_integrated_system(host: str = None, port: int = None, auth_token: str = "dashboard_token"):
-    try:
-        from backend.config.urls import WS_HOST, WS_PORT
-    except ImportError:
-        from config.urls import WS_HOST, WS_PORT
-    
-    host = host or WS_HOST  
-    port = port or WS_PORT
+async def start_integrated_system(host: str = None, port: int = None, auth_token: str = "dashboard_token",
+                                  config: Optional[ServerConfig] = None):
     """Start WebSocket server with full integration services"""
-    global server_instance, integration_service
+    global server_instance, integration_service, _shutdown_timeout
+    
+    config = (config or ServerConfig(host=host, port=port, auth_token=auth_token, integrated=True)).resolved()
+    _shutdown_timeout = config.shutdown_timeout
+    _use_eager_tasks()
     
     try:
         # Start WebSocket server
-        server_instance = WebSocketServer(host=host, port=port, auth_token=auth_token)
-        await server_instance.start_server()
+        server_instance = _create_server(config)
+        server_task = asyncio.create_task(server_instance.start_server())
+        _install_signal_handlers(server_instance.stopped_event)
+        
+        # Start integration service (imported lazily; only this mode needs it)
+        try:
+            from .websocket_integration_example import DashboardIntegrationService
+        except ImportError:
+            from websocket_integration_example import DashboardIntegrationService
         
-        # Start integration service
         integration_service = DashboardIntegrationService(server_instance)
         await integration_service.start()
         
-        print(f"Integrated dashboard system started successfully!")
-        print(f"WebSocket server: ws://{host}:{port}")
-        print(f"Auth token: {auth_token}")
-        print("Services running:")
-        print("  - WebSocket server")
-        print("  - EA data monitoring")
-        print("  - Portfolio monitoring")
-        print("  - Command monitoring")
-        print("Press Ctrl+C to stop all services")
+        logger.info("Integrated dashboard system started successfully!")
+        logger.info(f"WebSocket server: ws://{config.host}:{config.port}")
+        logger.info(f"Auth token: {config.auth_token}")
+        logger.info("Services running:")
+        logger.info("  - WebSocket server")
+        logger.info("  - EA data monitoring")
+        logger.info("  - Portfolio monitoring")
+        logger.info("  - Command monitoring")
+        logger.info("Press Ctrl+C to stop all services")
         
-        # Keep the system running
-        while server_instance.running:
-            await asyncio.sleep(1)
-            
-    except KeyboardInterrupt:
-        print("\nShutdown requested by user")
+        # Keep the system running until a shutdown signal arrives or the server stops
+        await server_instance.stopped_event.wait()
+        if server_task.done():
+            server_task.result()
+        
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        logger.info("Shutdown requested by user")
+        raise
     except Exception as e:
-        print(f"Error starting integrated system: {e}")
+        logger.error(f"Error starting integrated system: {e}")
         sys.exit(1)
     finally:
-        await cleanup()
+        await _request_shutdown()
 
 
-def main():
-    """Main entry point"""
+def _run_entry_point(config: ServerConfig):
+    """Run the selected system in this process until shutdown"""
+    # Start the appropriate system
+    if config.integrated:
+        entry_point = start_integrated_system(config=config)
+    else:
+        entry_point = start_websocket_server_only(config=config)
+    
+    # Prefer uvloop when installed (not available on Windows)
+    try:
+        import uvloop
+        loop_factory = uvloop.new_event_loop
+    except ImportError:
+        loop_factory = None
+    
+    try:
+        if sys.version_info >= (3, 11):
+            with asyncio.Runner(loop_factory=loop_factory) as runner:
+                runner.run(entry_point)
+        else:
+            if loop_factory is not None:
+                uvloop.install()
+            asyncio.run(entry_point)
+    except KeyboardInterrupt:
+        # Windows path: asyncio.run cancelled the entry point before cleanup could start
+        if not _shutting_down:
+            asyncio.run(cleanup())
+        logger.info("Shutdown complete")
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        sys.exit(1)
+
+
+def _run_workers(config: ServerConfig):
+    """Fork worker processes that share the listening port via SO_REUSEPORT"""
+    children = []
+    
+    worker_config = replace(config, reuse_port=True)
+    
+    for _ in range(config.workers):
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 1
+            try:
+                # Threads do not survive fork, so each worker runs its own listener
+                _start_log_listener()
+                _run_entry_point(worker_config)
+                exit_code = 0
+            finally:
+                _stop_log_listener()
+                logging.shutdown()
+                os._exit(exit_code)
+        children.append(pid)
+    
+    _start_log_listener()
+    logger.info(f"Started {len(children)} worker processes: {children}")
+    
+    def forward_signal(signum, frame):
+        for child_pid in children:
+            try:
+                os.kill(child_pid, signum)
+            except ProcessLookupError:
+                pass
+    
+    signal.signal(signal.SIGINT, forward_signal)
+    signal.signal(signal.SIGTERM, forward_signal)
+    
+    for child_pid in children:
+        os.waitpid(child_pid, 0)
+    
+    logger.info("All workers stopped")
+
+
+def _build_parser():
+    """Command line parser whose defaults come from ServerConfig"""
     import argparse
     
+    defaults = ServerConfig()
+    
     parser = argparse.ArgumentParser(description="Start WebSocket server for MT5 Dashboard")
     try:
         from backend.config.urls import WS_HOST
@@ -146,34 +433,60 @@ def main():
         from config.urls import WS_PORT
     
     parser.add_argument("--port", type=int, default=WS_PORT, help=f"Server port (default: {WS_PORT})")
-    parser.add_argument("--auth-token", default="dashboard_token", help="Authentication token")
-    parser.add_argument("--integrated", action="store_true", help="Start with full integration services")
+    parser.add_argument("--auth-token", default=defaults.auth_token, help="Authentication token")
+    parser.add_argument("--integrated", action="store_true", default=defaults.integrated,
+                       help="Start with full integration services")
+    parser.add_argument("--batch-window-ms", type=int, default=defaults.batch_window_ms,
+                       help="Coalescing window for outbound broadcasts in ms; batched frames carry "
+                            "newline-delimited messages, so clients must opt in (default: %(default)s, disabled)")
+    parser.add_argument("--batch-max-bytes", type=int, default=defaults.batch_max_bytes,
+                       help="Flush a broadcast batch once it reaches this size (default: %(default)s)")
+    parser.add_argument("--writer-limit", type=int, default=defaults.writer_limit,
+                       help="Per-connection write buffer limit in bytes (default: %(default)s)")
+    parser.add_argument("--max-queue", type=int, default=defaults.max_queue,
+                       help="Maximum queued incoming messages per connection (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=defaults.workers,
+                       help="Number of worker processes sharing the port via SO_REUSEPORT (default: %(default)s, not on Windows)")
+    parser.add_argument("--json", default=defaults.json_backend, choices=["orjson", "stdlib"],
+                       help="JSON encoder for outbound frames; orjson falls back to stdlib if missing (default: %(default)s)")
+    parser.add_argument("--prepared-cache-mb", type=int, default=defaults.prepared_cache_mb,
+                       help="Cache of pre-compressed broadcast frames in MiB, 0 disables (default: %(default)s)")
+    parser.add_argument("--shutdown-timeout", type=float, default=defaults.shutdown_timeout,
+                       help="Force exit if graceful shutdown takes longer than this many seconds (default: %(default)s)")
+    parser.add_argument("--nodelay", action=argparse.BooleanOptionalAction, default=defaults.tcp_nodelay,
+                       help="Set TCP_NODELAY on the listener and accepted sockets")
+    parser.add_argument("--keepalive", action=argparse.BooleanOptionalAction, default=defaults.tcp_keepalive,
+                       help="Enable TCP keepalive probes on the listener and accepted sockets")
+    parser.add_argument("--compression", action=argparse.BooleanOptionalAction, default=defaults.compression,
+                       help="Negotiate per-client permessage-deflate; ignored with --prepared-cache-mb")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], 
                        help="Logging level")
     
+    return parser
+
+
+def main():
+    """Main entry point"""
+    parser = _build_parser()
+    
     args = parser.parse_args()
     
     # Configure logging
-    logging.basicConfig(
-        level=getattr(logging, args.log_level),
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    )
+    _configure_logging(getattr(logging, args.log_level))
     
-    # Set up signal handlers
-    signal.signal(signal.SIGINT, signal_handler)
-    signal.signal(signal.SIGTERM, signal_handler)
+    config = ServerConfig.from_args(args)
+    errors = config.validate()
+    if errors:
+        parser.error("; ".join(errors))
     
-    # Start the appropriate system
     try:
-        if args.integrated:
-            asyncio.run(start_integrated_system(args.host, args.port, args.auth_token))
+        if config.workers > 1 and hasattr(os, "fork"):
+            _run_workers(config)
         else:
-            asyncio.run(start_websocket_server_only(args.host, args.port, args.auth_token))
-    except KeyboardInterrupt:
-        print("\nShutdown complete")
-    except Exception as e:
-        print(f"Fatal error: {e}")
-        sys.exit(1)
+            _start_log_listener()
+            _run_entry_point(config)
+    finally:
+        _stop_log_listener()
 
 
 if __name__ == "__main__":
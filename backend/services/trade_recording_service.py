@@ -5,18 +5,32 @@ Comprehensive service for recording trades from dashboard commands through MT5 e
 and back to dashboard display. Handles the complete trade lifecycle with proper logging.
 """
 
+import asyncio
+import bisect
+import heapq
 import logging
 import json
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from dataclasses import dataclass, asdict
+from typing import Callable, Deque, Dict, List, Optional, Any, Tuple, get_args
+from dataclasses import dataclass, asdict, field, fields
 from enum import Enum
+from itertools import chain
+
+import numpy as np
+from pydantic import BaseModel, field_validator
 
 # Handle imports for both running from root and from backend directory
 try:
     from backend.database.connection import DatabaseManager
+    from backend.services._trade_kernels import ea_stats
 except ImportError:
     from database.connection import DatabaseManager
+    from services._trade_kernels import ea_stats
 from sqlalchemy import text, desc
 from sqlalchemy.orm import Session
 
@@ -27,6 +41,95 @@ from sqlalchemy.orm import Session
 
 logger = logging.getLogger(__name__)
 
+# Window in which repeated updates for the same trade or EA are coalesced
+_BROADCAST_COALESCE_SECONDS = 0.01
+
+# Maximum number of trades with an unsent update; the oldest is dropped beyond this
+_BROADCAST_MAX_PENDING = 10_000
+
+# Finished trades kept in memory; older ones are served from the database
+_HISTORY_MAX_RECORDS = 10_000
+
+# Maximum number of EA performance summaries kept in the LRU cache
+_SUMMARY_CACHE_SIZE = 4096
+
+# Maximum number of trade rows written in one executemany batch
+_WRITE_BATCH_SIZE = 500
+
+# How long the writer waits for more rows before committing a partial batch
+_WRITE_FLUSH_INTERVAL = 0.05
+
+# WAL lets dashboard reads proceed during writes; NORMAL sync skips the per-commit fsync
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA busy_timeout=5000",
+    "PRAGMA cache_size=-20000",
+)
+
+_CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS trade_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trade_id TEXT UNIQUE NOT NULL,
+        ea_id INTEGER,
+        magic_number INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        trade_type TEXT NOT NULL,
+        volume REAL NOT NULL,
+        requested_price REAL,
+        actual_price REAL,
+        sl REAL,
+        tp REAL,
+        status TEXT NOT NULL,
+        profit REAL DEFAULT 0.0,
+        commission REAL DEFAULT 0.0,
+        swap REAL DEFAULT 0.0,
+        comment TEXT,
+        request_time INTEGER,
+        fill_time INTEGER,
+        close_time INTEGER,
+        dashboard_command_id TEXT,
+        mt5_ticket INTEGER,
+        risk_percent REAL DEFAULT 0.0,
+        account_balance REAL DEFAULT 0.0,
+        position_size_usd REAL DEFAULT 0.0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+# Per-EA reads filter on magic_number (ea_id is optional and often unset), so the
+# composite index leads with it and supersedes the old single-column magic index
+_INDEX_SQL = (
+    "DROP INDEX IF EXISTS idx_trade_records_magic",
+    "CREATE INDEX IF NOT EXISTS idx_trade_records_magic_status "
+    "ON trade_records(magic_number, status, close_time DESC)",
+    "CREATE INDEX IF NOT EXISTS idx_trade_records_ticket ON trade_records(mt5_ticket)",
+    "CREATE INDEX IF NOT EXISTS idx_trade_records_status_close ON trade_records(status, close_time)",
+)
+
+# Columns stored as epoch milliseconds; older tables declared them TEXT
+_TIME_COLUMNS = ("request_time", "fill_time", "close_time")
+
+_SELECT_BY_ID_SQL = """
+    SELECT trade_id, ea_id, magic_number, symbol, trade_type, volume,
+           requested_price, actual_price, sl, tp, status, profit,
+           commission, swap, comment, request_time, fill_time, close_time,
+           dashboard_command_id, mt5_ticket, risk_percent, account_balance,
+           position_size_usd
+    FROM trade_records WHERE trade_id = ?
+"""
+
+_INSERT_SQL = """
+    INSERT OR REPLACE INTO trade_records (
+        trade_id, ea_id, magic_number, symbol, trade_type, volume,
+        requested_price, actual_price, sl, tp, status, profit,
+        commission, swap, comment, request_time, fill_time, close_time,
+        dashboard_command_id, mt5_ticket, risk_percent, account_balance,
+        position_size_usd
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
 
 class TradeStatus(Enum):
     """Trade status enumeration"""
@@ -47,7 +150,181 @@ class TradeType(Enum):
     SELL_STOP = "SELL_STOP"
 
 
-@dataclass
+# Value -> member map, avoiding Enum.__call__ on every event
+_TRADE_TYPES = {member.value: member for member in TradeType}
+
+
+def _trade_type(value: str) -> TradeType:
+    """Resolve a trade type value, raising ValueError like TradeType(value)"""
+    try:
+        return _TRADE_TYPES[value]
+    except (KeyError, TypeError):
+        raise ValueError(f"{value!r} is not a valid TradeType") from None
+
+
+# Slotted records drop the per-instance __dict__ (dataclass slots need Python 3.10+)
+_RECORD_OPTIONS = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+
+# Journal labels per trade type, looked up instead of substring checks
+_JOURNAL_ACTIONS = {
+    TradeType.BUY: "Buy",
+    TradeType.BUY_LIMIT: "Buy",
+    TradeType.BUY_STOP: "Buy",
+    TradeType.SELL: "Sell",
+    TradeType.SELL_LIMIT: "Sell",
+    TradeType.SELL_STOP: "Sell",
+}
+_JOURNAL_ORDER_TAGS = {
+    TradeType.BUY: "[MARKET]",
+    TradeType.SELL: "[MARKET]",
+    TradeType.BUY_LIMIT: "[LIMIT]",
+    TradeType.SELL_LIMIT: "[LIMIT]",
+    TradeType.BUY_STOP: "[STOP]",
+    TradeType.SELL_STOP: "[STOP]",
+}
+
+
+def _encode_datetime(value: Optional[datetime]) -> Optional[str]:
+    """ISO string for an optional datetime field"""
+    return value.isoformat() if value is not None else None
+
+
+def _encode_enum(value: Optional[Enum]) -> Any:
+    """Underlying value for an optional enum field"""
+    return value.value if value is not None else None
+
+
+def _dict_fields(cls: type) -> Tuple[Tuple[str, Optional[Callable[[Any], Any]]], ...]:
+    """Public fields of a record class paired with the encoder their declared type needs"""
+    specs = []
+    for record_field in fields(cls):
+        if record_field.name.startswith('_'):
+            continue
+        types = (record_field.type,) + get_args(record_field.type)
+        if datetime in types:
+            encoder = _encode_datetime
+        elif any(isinstance(t, type) and issubclass(t, Enum) for t in types):
+            encoder = _encode_enum
+        else:
+            encoder = None
+        specs.append((record_field.name, encoder))
+    return tuple(specs)
+
+
+def _record_to_dict(record: Any) -> Dict[str, Any]:
+    """Convert a record dataclass to a JSON-ready dictionary using its _DICT_FIELDS"""
+    result = {}
+    for name, encoder in record._DICT_FIELDS:
+        value = getattr(record, name)
+        result[name] = value if encoder is None else encoder(value)
+    return result
+
+
+# Integer codes for TradeStatus in the NumPy history columns
+_STATUS_CODES = {status: code for code, status in enumerate(TradeStatus)}
+_CLOSED_CODE = _STATUS_CODES[TradeStatus.CLOSED]
+
+# ea_stats() result for an EA with no closed trades
+_NO_CLOSED_STATS = (0.0, 0.0, 0.0, 0, 0, 0, -1e308, 1e308)
+
+
+def _merge_closed_stats(a: Tuple, b: Tuple) -> Tuple:
+    """Combine two ea_stats() results"""
+    return (a[0] + b[0], a[1] + b[1], a[2] + b[2], a[3] + b[3], a[4] + b[4], a[5] + b[5],
+            max(a[6], b[6]), min(a[7], b[7]))
+
+
+def _to_epoch_ms(value: Optional[datetime]) -> Optional[int]:
+    """Datetime as integer epoch milliseconds for the trade_records time columns"""
+    return int(value.timestamp() * 1000) if value else None
+
+
+def _from_db_time(value: Any) -> Optional[datetime]:
+    """Parse a stored time column; rows written before epoch-ms hold ISO text"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        # Tables created before the INTEGER schema give epoch ms TEXT affinity
+        if not value.isdigit():
+            return datetime.fromisoformat(value)
+        value = int(value)
+    return datetime.fromtimestamp(value / 1000)
+
+
+class _HistoryColumns:
+    """Column-oriented mirror of trade_history used for vectorized analytics
+    
+    Rows live in [start, size); evicting the oldest trade only advances start, and
+    the freed prefix is reclaimed before the columns are allowed to grow.
+    """
+    
+    def __init__(self, capacity: int = 1024):
+        self.start = 0
+        self.size = 0
+        self.magic = np.zeros(capacity, dtype=np.int64)
+        self.profit = np.zeros(capacity, dtype=np.float64)
+        self.status = np.zeros(capacity, dtype=np.uint8)
+    
+    def __len__(self) -> int:
+        return self.size - self.start
+    
+    def append(self, magic_number: int, profit: float, status: TradeStatus):
+        """Append one trade, compacting or doubling the columns when full"""
+        if self.size == len(self.magic):
+            if self.start:
+                self._compact()
+            else:
+                capacity = len(self.magic) * 2
+                self.magic = np.resize(self.magic, capacity)
+                self.profit = np.resize(self.profit, capacity)
+                self.status = np.resize(self.status, capacity)
+        
+        self.magic[self.size] = magic_number
+        self.profit[self.size] = profit
+        self.status[self.size] = _STATUS_CODES[status]
+        self.size += 1
+    
+    def popleft(self):
+        """Drop the oldest trade, mirroring eviction from trade_history"""
+        if self.start < self.size:
+            self.start += 1
+    
+    def _compact(self):
+        """Move the live rows to the front of the columns"""
+        lo, n = self.start, self.size - self.start
+        self.magic[:n] = self.magic[lo:self.size]
+        self.profit[:n] = self.profit[lo:self.size]
+        self.status[:n] = self.status[lo:self.size]
+        self.start, self.size = 0, n
+    
+    def remove_magic(self, magic_number: int):
+        """Drop all trades of one EA, compacting the columns in place"""
+        lo, n = self.start, self.size
+        keep = self.magic[lo:n] != magic_number
+        kept = int(np.count_nonzero(keep))
+        self.magic[:kept] = self.magic[lo:n][keep]
+        self.profit[:kept] = self.profit[lo:n][keep]
+        self.status[:kept] = self.status[lo:n][keep]
+        self.start, self.size = 0, kept
+    
+    def closed_profits(self, magic_number: int) -> np.ndarray:
+        """Profits of closed trades for one EA"""
+        lo, n = self.start, self.size
+        mask = (self.magic[lo:n] == magic_number) & (self.status[lo:n] == _CLOSED_CODE)
+        return self.profit[lo:n][mask]
+    
+    def closed_stats(self, magic_number: int) -> Tuple[float, float, float, int, int, int, float, float]:
+        """Single-pass closed-trade totals for one EA (see _trade_kernels.ea_stats)"""
+        lo, n = self.start, self.size
+        return ea_stats(self.magic[lo:n], self.status[lo:n], self.profit[lo:n], magic_number, _CLOSED_CODE)
+    
+    def count(self, magic_number: int) -> int:
+        """Number of historical trades for one EA"""
+        return int(np.count_nonzero(self.magic[self.start:self.size] == magic_number))
+
+
+@dataclass(**_RECORD_OPTIONS)
 class EARecord:
     """EA tracking record"""
     magic_number: int
@@ -67,33 +344,28 @@ class EARecord:
     active_trades: int = 0
     total_profit: float = 0.0
     
+    # Serialized form, cleared by mark_changed() (not serialized)
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.last_heartbeat is None:
             self.last_heartbeat = datetime.now()
     
+    def mark_changed(self):
+        """Invalidate cached serializations after fields are updated"""
+        self._dict_cache = None
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
-            'magic_number': self.magic_number,
-            'ea_name': self.ea_name,
-            'symbol': self.symbol,
-            'timeframe': self.timeframe,
-            'status': self.status,
-            'last_heartbeat': self.last_heartbeat.isoformat() if self.last_heartbeat else None,
-            'account_number': self.account_number,
-            'broker': self.broker,
-            'balance': self.balance,
-            'equity': self.equity,
-            'margin': self.margin,
-            'free_margin': self.free_margin,
-            'margin_level': self.margin_level,
-            'total_trades': self.total_trades,
-            'active_trades': self.active_trades,
-            'total_profit': self.total_profit
-        }
-
-
-@dataclass
+        if self._dict_cache is None:
+            self._dict_cache = _record_to_dict(self)
+        return dict(self._dict_cache)
+
+
+EARecord._DICT_FIELDS = _dict_fields(EARecord)
+
+
+@dataclass(**_RECORD_OPTIONS)
 class TradeRecord:
     """Complete trade record with all lifecycle information"""
     trade_id: str
@@ -126,42 +398,73 @@ class TradeRecord:
     account_balance: float = 0.0
     position_size_usd: float = 0.0
     
+    # Cached journal line and serialized form, refreshed by mark_changed() (not serialized)
+    _journal_cache: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
     def __post_init__(self):
         if self.request_time is None:
             self.request_time = datetime.now()
     
+    def mark_changed(self):
+        """Refresh cached journal line and serialization after fields are updated"""
+        self._dict_cache = None
+        self.refresh_journal()
+    
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization"""
-        return {
-            'trade_id': self.trade_id,
-            'ea_id': self.ea_id,
-            'magic_number': self.magic_number,
-            'symbol': self.symbol,
-            'trade_type': self.trade_type.value,
-            'volume': self.volume,
-            'requested_price': self.requested_price,
-            'actual_price': self.actual_price,
-            'sl': self.sl,
-            'tp': self.tp,
-            'status': self.status.value,
-            'profit': self.profit,
-            'commission': self.commission,
-            'swap': self.swap,
-            'comment': self.comment,
-            'request_time': self.request_time.isoformat() if self.request_time else None,
-            'fill_time': self.fill_time.isoformat() if self.fill_time else None,
-            'close_time': self.close_time.isoformat() if self.close_time else None,
-            'dashboard_command_id': self.dashboard_command_id,
-            'mt5_ticket': self.mt5_ticket,
-            'risk_percent': self.risk_percent,
-            'account_balance': self.account_balance,
-            'position_size_usd': self.position_size_usd
-        }
+        if self._dict_cache is None:
+            self._dict_cache = _record_to_dict(self)
+        return dict(self._dict_cache)
+    
+    @classmethod
+    def from_row(cls, row: Tuple) -> "TradeRecord":
+        """Rebuild a record from a trade_records row in _INSERT_SQL column order"""
+        values = list(row)
+        values[4] = _trade_type(values[4])
+        values[10] = TradeStatus(values[10])
+        for index in (15, 16, 17):
+            values[index] = _from_db_time(values[index])
+        return cls(*values)
+    
+    def as_tuple(self) -> Tuple:
+        """Snapshot as a trade_records row in _INSERT_SQL column order"""
+        return (
+            self.trade_id,
+            self.ea_id,
+            self.magic_number,
+            self.symbol,
+            self.trade_type.value,
+            self.volume,
+            self.requested_price,
+            self.actual_price,
+            self.sl,
+            self.tp,
+            self.status.value,
+            self.profit,
+            self.commission,
+            self.swap,
+            self.comment,
+            _to_epoch_ms(self.request_time),
+            _to_epoch_ms(self.fill_time),
+            _to_epoch_ms(self.close_time),
+            self.dashboard_command_id,
+            self.mt5_ticket,
+            self.risk_percent,
+            self.account_balance,
+            self.position_size_usd
+        )
     
     def to_journal_format(self) -> str:
         """Format trade for journal display"""
-        action = "Buy" if "BUY" in self.trade_type.value else "Sell"
-        order_type = "[LIMIT]" if "LIMIT" in self.trade_type.value else "[STOP]" if "STOP" in self.trade_type.value else "[MARKET]"
+        if self._journal_cache is None:
+            self.refresh_journal()
+        return self._journal_cache
+    
+    def refresh_journal(self):
+        """Rebuild the cached journal line after status, price or profit changes"""
+        action = _JOURNAL_ACTIONS[self.trade_type]
+        order_type = _JOURNAL_ORDER_TAGS[self.trade_type]
         
         if self.status == TradeStatus.FILLED and self.actual_price:
             price_info = f"@ {self.actual_price}"
@@ -169,9 +472,44 @@ class TradeRecord:
             price_info = f"@ {self.requested_price} (Pending)"
         
         if self.status == TradeStatus.CLOSED and self.profit != 0:
-            return f"{order_type} {self.symbol} {action} {self.volume} {price_info} -> Closed (P/L: {self.profit:.2f})"
+            self._journal_cache = f"{order_type} {self.symbol} {action} {self.volume} {price_info} -> Closed (P/L: {self.profit:.2f})"
         else:
-            return f"{order_type} {self.symbol} {action} {self.volume} {price_info}"
+            self._journal_cache = f"{order_type} {self.symbol} {action} {self.volume} {price_info}"
+
+
+TradeRecord._DICT_FIELDS = _dict_fields(TradeRecord)
+
+
+class FillPayload(BaseModel):
+    """MT5 fill event, coerced once at the service boundary
+    
+    Only the numeric fields the handler used to pass through float() are coerced;
+    identifiers and text are taken as sent, as the old dict lookups did.
+    """
+    magic_number: Any = None
+    ticket: Any = None
+    symbol: Any = None
+    order_type: Any = 'BUY'
+    volume: float = 0.0
+    price: Optional[float] = None
+    sl: Optional[float] = None
+    tp: Optional[float] = None
+    comment: Any = ''
+    commission: float = 0.0
+    swap: float = 0.0
+    account_balance: float = 0.0
+    account_equity: float = 0.0
+    
+    @field_validator('sl', 'tp', mode='before')
+    @classmethod
+    def _unset_level(cls, value: Any) -> Any:
+        """Empty or zero SL/TP means none was set"""
+        return value or None
+
+
+def _recency(trade: TradeRecord) -> datetime:
+    """Most recent activity time of a trade"""
+    return trade.close_time or trade.fill_time or trade.request_time
 
 
 class TradeRecordingService:
@@ -180,12 +518,64 @@ class TradeRecordingService:
     def __init__(self, db_manager: DatabaseManager):
         self.db = db_manager
         self.active_trades: Dict[str, TradeRecord] = {}
-        self.trade_history: List[TradeRecord] = []
+        self.trade_history: Deque[TradeRecord] = deque(maxlen=_HISTORY_MAX_RECORDS)
+        
+        # Secondary indexes over active_trades, maintained by _index_add/_index_remove
+        self._by_magic: Dict[int, Dict[str, TradeRecord]] = defaultdict(dict)
+        self._by_ticket: Dict[int, TradeRecord] = {}
+        self._pending_by_magic_symbol: Dict[Tuple[int, str], deque] = defaultdict(deque)
+        
+        # History ordered most recent first, with parallel sort keys for bisect
+        self._history_by_recent: List[TradeRecord] = []
+        self._history_keys: List[float] = []
+        
+        # Columnar copy of trade_history for performance summaries
+        self._history_columns = _HistoryColumns()
+        
+        # Per-EA change counters; performance summaries are cached against them
+        self._ea_seq: Dict[int, int] = defaultdict(int)
+        self._summary_cache: "OrderedDict[int, Tuple[int, Dict[str, Any]]]" = OrderedDict()
+        
+        # EAs whose incremental statistics need a full recompute
+        self._stale_ea_stats: set = set()
+        
+        # Per-EA (trade count, ea_stats totals) of trades evicted from history, so EA
+        # statistics and performance summaries keep covering every recorded trade
+        self._evicted_totals: Dict[int, Tuple[int, Tuple]] = {}
+        
+        # Persistent database connection and batched write queue (created lazily)
+        self._db_conn: Optional[sqlite3.Connection] = None
+        self._db_cursor: Optional[sqlite3.Cursor] = None
+        self._schema_ready = False
+        
+        # The writer connection is used only by _write_rows in executor threads;
+        # database reads go through their own connection, which WAL lets run alongside
+        self._read_conn: Optional[sqlite3.Connection] = None
+        self._db_open_lock = threading.Lock()
+        self._read_lock = threading.Lock()
+        self._pending_rows: Deque[Tuple] = deque()
+        self._rows_waiter: Optional[asyncio.Future] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._closing = False
+        
+        # Pending dashboard broadcasts, latest update per trade ID / magic number
+        self._pending_trade_updates: Dict[str, Tuple[str, TradeRecord]] = {}
+        self._pending_ea_updates: Dict[int, Tuple[str, EARecord]] = {}
+        self._broadcast_task: Optional[asyncio.Task] = None
         
         # EA tracking
         self.registered_eas: Dict[int, EARecord] = {}  # magic_number -> EARecord
         self.ea_heartbeat_timeout = 300  # 5 minutes
         
+        # Heartbeat expiry tracking: min-heap of (heartbeat, magic), one entry per EA
+        self._heartbeat_heap: List[Tuple[datetime, int]] = []
+        self._heartbeat_queued: set = set()
+        self._active_eas: Dict[int, EARecord] = {}
+        
+        # Registration position of each EA; active EAs are listed in this order
+        self._ea_order: Dict[int, int] = {}
+        self._active_order_dirty = False
+        
         # WebSocket server for real-time updates
         self.websocket_server = None
         try:
@@ -197,6 +587,22 @@ class TradeRecordingService:
                 self.websocket_server = get_websocket_server()
             except ImportError:
                 logger.warning("WebSocket server not available - real-time updates disabled")
+        
+        # Resolve broadcast callables once; None disables real-time updates
+        server = self.websocket_server
+        self._send_trade_update = server.broadcast_trade_update if server else None
+        self._send_trade_batch = server.broadcast_trade_batch if server else None
+        self._send_ea_update = server.broadcast_ea_update if server else None
+        self._send_ea_batch = server.broadcast_ea_batch if server else None
+        
+        # Fills, closes and returning EAs change what MT5 reports; refresh EA data early.
+        # Import the module under the path the EA sync routes use, so both see the
+        # same updater singleton; the wakeup only matters once its loop is started
+        try:
+            from services.real_time_ea_updater import request_ea_update
+        except ImportError:
+            from backend.services.real_time_ea_updater import request_ea_update
+        self._request_ea_update = request_ea_update
     
     async def register_ea(self, ea_data: Dict[str, Any]) -> bool:
         """
@@ -230,23 +636,27 @@ class TradeRecordingService:
             # Update existing or add new
             if magic_number in self.registered_eas:
                 existing = self.registered_eas[magic_number]
-                existing.last_heartbeat = datetime.now()
-                existing.status = "active"
+                self._touch_heartbeat(existing, datetime.now())
                 existing.balance = ea_record.balance
                 existing.equity = ea_record.equity
                 existing.margin = ea_record.margin
                 existing.free_margin = ea_record.free_margin
                 existing.margin_level = ea_record.margin_level
-                logger.info(f"EA {magic_number} ({existing.ea_name}) heartbeat updated")
+                existing.mark_changed()
+                logger.info("EA %s (%s) heartbeat updated", magic_number, existing.ea_name)
             else:
                 self.registered_eas[magic_number] = ea_record
+                self._ea_order[magic_number] = len(self._ea_order)
+                self._touch_heartbeat(ea_record, ea_record.last_heartbeat)
+                self._stale_ea_stats.add(magic_number)
                 logger.info(f"EA registered: {ea_record.ea_name} (Magic: {magic_number}) on {ea_record.symbol}")
             
-            # Update EA statistics
-            await self._update_ea_statistics(magic_number)
+            # Seed statistics for new EAs; afterwards they are kept incrementally
+            if magic_number in self._stale_ea_stats:
+                await self._update_ea_statistics(magic_number)
             
             # Broadcast EA update
-            await self._broadcast_ea_update(self.registered_eas[magic_number], "registered")
+            self._broadcast_ea_update(self.registered_eas[magic_number], "registered")
             
             return True
             
@@ -277,8 +687,13 @@ class TradeRecordingService:
                 return True
             
             ea_record = self.registered_eas[magic_number]
-            ea_record.last_heartbeat = datetime.now()
-            ea_record.status = "active"
+            now = datetime.now()
+            returning = ea_record.last_heartbeat < now - timedelta(seconds=self.ea_heartbeat_timeout)
+            self._touch_heartbeat(ea_record, now)
+            
+            # Routine heartbeats leave the updater on its interval
+            if returning:
+                self._request_ea_update()
             
             # Update account data if provided
             if account_data:
@@ -287,9 +702,11 @@ class TradeRecordingService:
                 ea_record.margin = float(account_data.get('margin', ea_record.margin))
                 ea_record.free_margin = float(account_data.get('free_margin', ea_record.free_margin))
                 ea_record.margin_level = float(account_data.get('margin_level', ea_record.margin_level))
+                ea_record.mark_changed()
             
-            # Update statistics
-            await self._update_ea_statistics(magic_number)
+            # Statistics are maintained incrementally; only recompute if invalidated
+            if magic_number in self._stale_ea_stats:
+                await self._update_ea_statistics(magic_number)
             
             return True
             
@@ -301,49 +718,92 @@ class TradeRecordingService:
         """Get all registered EAs"""
         return list(self.registered_eas.values())
     
+    def _touch_heartbeat(self, ea_record: EARecord, now: datetime):
+        """Record an EA heartbeat and mark the EA active"""
+        ea_record.last_heartbeat = now
+        ea_record.status = "active"
+        ea_record.mark_changed()
+        
+        active = self._active_eas
+        if ea_record.magic_number not in active:
+            # An EA coming back from inactive lands after EAs registered later
+            if active and self._ea_order[ea_record.magic_number] < self._ea_order[next(reversed(active))]:
+                self._active_order_dirty = True
+            active[ea_record.magic_number] = ea_record
+        
+        if ea_record.magic_number not in self._heartbeat_queued:
+            heapq.heappush(self._heartbeat_heap, (now, ea_record.magic_number))
+            self._heartbeat_queued.add(ea_record.magic_number)
+    
     def get_active_eas(self) -> List[EARecord]:
         """Get only active EAs (recent heartbeat)"""
-        now = datetime.now()
-        active_eas = []
+        cutoff = datetime.now() - timedelta(seconds=self.ea_heartbeat_timeout)
+        heap = self._heartbeat_heap
         
-        for ea in self.registered_eas.values():
-            if ea.last_heartbeat:
-                time_diff = (now - ea.last_heartbeat).total_seconds()
-                if time_diff <= self.ea_heartbeat_timeout:
-                    ea.status = "active"
-                    active_eas.append(ea)
-                else:
-                    ea.status = "inactive"
+        # Only EAs whose queued heartbeat is past the cutoff are inspected
+        while heap and heap[0][0] < cutoff:
+            _, magic_number = heapq.heappop(heap)
+            ea = self.registered_eas.get(magic_number)
+            if ea is not None and ea.last_heartbeat >= cutoff:
+                # Heartbeat refreshed since it was queued; requeue at its real time
+                heapq.heappush(heap, (ea.last_heartbeat, magic_number))
+                continue
+            
+            self._heartbeat_queued.discard(magic_number)
+            expired = self._active_eas.pop(magic_number, None)
+            if expired is not None:
+                expired.status = "inactive"
+                expired.mark_changed()
         
-        return active_eas
+        if self._active_order_dirty:
+            active = self._active_eas
+            self._active_eas = {magic: active[magic] for magic in sorted(active, key=self._ea_order.__getitem__)}
+            self._active_order_dirty = False
+        
+        return list(self._active_eas.values())
     
     def get_ea_by_magic(self, magic_number: int) -> Optional[EARecord]:
         """Get EA by magic number"""
         return self.registered_eas.get(magic_number)
     
     async def _update_ea_statistics(self, magic_number: int):
-        """Update EA trade statistics"""
+        """Recompute EA trade statistics from scratch"""
         try:
+            self._stale_ea_stats.discard(magic_number)
             if magic_number not in self.registered_eas:
                 return
             
             ea_record = self.registered_eas[magic_number]
             
             # Count active trades
-            active_count = len([t for t in self.active_trades.values() if t.magic_number == magic_number])
+            active_count = len(self._by_magic.get(magic_number, ()))
             
-            # Count total trades and calculate profit
-            ea_history = [t for t in self.trade_history if t.magic_number == magic_number]
-            total_trades = len(ea_history)
-            total_profit = sum(t.profit for t in ea_history if t.status == TradeStatus.CLOSED)
+            # Count total trades and calculate profit, including evicted trades
+            evicted_count, _ = self._evicted_totals.get(magic_number, (0, _NO_CLOSED_STATS))
+            total_trades = self._history_columns.count(magic_number) + evicted_count
+            total_profit = float(self._closed_stats(magic_number)[0])
             
             # Update EA record
             ea_record.active_trades = active_count
             ea_record.total_trades = total_trades
             ea_record.total_profit = total_profit
+            ea_record.mark_changed()
             
         except Exception as e:
             logger.error(f"Error updating EA statistics: {e}")
+    
+    def _adjust_ea_statistics(self, magic_number: int, active: int = 0, total: int = 0, profit: float = 0.0):
+        """Apply an incremental change to an EA's trade statistics"""
+        self._ea_seq[magic_number] += 1
+        
+        ea_record = self.registered_eas.get(magic_number)
+        if ea_record is None:
+            return
+        
+        ea_record.active_trades += active
+        ea_record.total_trades += total
+        ea_record.total_profit += profit
+        ea_record.mark_changed()
 
     async def record_dashboard_command(self, command_data: Dict[str, Any]) -> str:
         """
@@ -356,8 +816,10 @@ class TradeRecordingService:
             Trade ID for tracking
         """
         try:
-            # Generate unique trade ID
-            trade_id = f"trade_{int(datetime.now().timestamp())}_{command_data.get('magic_number', 0)}"
+            now = datetime.now()
+            
+            # Generate unique trade ID (nanoseconds keep same-second commands distinct)
+            trade_id = f"trade_{time.time_ns()}_{command_data.get('magic_number', 0)}"
             
             # Extract trade information
             params = command_data.get('parameters', {})
@@ -367,7 +829,7 @@ class TradeRecordingService:
                 ea_id=0,  # Will be resolved later
                 magic_number=command_data.get('magic_number', 0),
                 symbol=params.get('symbol', 'UNKNOWN'),
-                trade_type=TradeType(params.get('order_type', 'BUY')),
+                trade_type=_trade_type(params.get('order_type', 'BUY')),
                 volume=float(params.get('volume', 0.01)),
                 requested_price=float(params.get('price', 0.0)),
                 sl=float(params.get('sl')) if params.get('sl') else None,
@@ -375,20 +837,21 @@ class TradeRecordingService:
                 comment=params.get('comment', ''),
                 dashboard_command_id=command_data.get('command_id'),
                 risk_percent=float(params.get('risk_percent', 0.0)),
-                account_balance=float(params.get('account_balance', 0.0))
+                account_balance=float(params.get('account_balance', 0.0)),
+                request_time=now
             )
             
             # Store in active trades
-            self.active_trades[trade_id] = trade_record
+            self._index_add(trade_record)
             
             # Log the command
-            logger.info(f"[ENTRY] Dashboard command recorded: {trade_record.to_journal_format()}")
+            logger.info("[ENTRY] Dashboard command recorded: %s", trade_record.to_journal_format())
             
             # Store in database
             await self._store_trade_record(trade_record)
             
             # Broadcast to dashboard
-            await self._broadcast_trade_update(trade_record, "command_recorded")
+            self._broadcast_trade_update(trade_record, "command_recorded")
             
             return trade_id
             
@@ -407,9 +870,11 @@ class TradeRecordingService:
             True if successfully recorded
         """
         try:
-            magic_number = fill_data.get('magic_number')
-            mt5_ticket = fill_data.get('ticket')
-            symbol = fill_data.get('symbol')
+            now = datetime.now()
+            payload = FillPayload.model_validate(fill_data)
+            magic_number = payload.magic_number
+            mt5_ticket = payload.ticket
+            symbol = payload.symbol
             
             # Auto-register EA if not already registered
             if magic_number not in self.registered_eas:
@@ -418,64 +883,64 @@ class TradeRecordingService:
                     'ea_name': f'EA_{magic_number}',
                     'symbol': symbol,
                     'timeframe': 'AUTO_DETECTED',
-                    'balance': float(fill_data.get('account_balance', 0.0)),
-                    'equity': float(fill_data.get('account_equity', 0.0))
+                    'balance': payload.account_balance,
+                    'equity': payload.account_equity
                 })
             else:
                 # Update heartbeat
                 await self.update_ea_heartbeat(magic_number, {
-                    'balance': float(fill_data.get('account_balance', 0.0)),
-                    'equity': float(fill_data.get('account_equity', 0.0))
+                    'balance': payload.account_balance,
+                    'equity': payload.account_equity
                 })
             
-            # Find matching trade record
-            trade_record = None
-            for trade_id, record in self.active_trades.items():
-                if (record.magic_number == magic_number and 
-                    record.symbol == symbol and 
-                    record.status == TradeStatus.PENDING):
-                    trade_record = record
-                    break
+            # Find matching trade record (oldest pending order for this EA/symbol)
+            trade_record = self._pop_pending(magic_number, symbol)
             
             if not trade_record:
                 # Create new trade record for fills without dashboard command
-                trade_id = f"mt5_fill_{int(datetime.now().timestamp())}_{magic_number}"
+                trade_id = f"mt5_fill_{time.time_ns()}_{magic_number}"
                 trade_record = TradeRecord(
                     trade_id=trade_id,
                     ea_id=0,  # Will be resolved
                     magic_number=magic_number,
                     symbol=symbol,
-                    trade_type=TradeType(fill_data.get('order_type', 'BUY')),
-                    volume=float(fill_data.get('volume', 0.0)),
-                    requested_price=float(fill_data.get('price', 0.0)),
-                    actual_price=float(fill_data.get('price', 0.0)),
-                    sl=float(fill_data.get('sl')) if fill_data.get('sl') else None,
-                    tp=float(fill_data.get('tp')) if fill_data.get('tp') else None,
-                    comment=fill_data.get('comment', ''),
-                    mt5_ticket=mt5_ticket
+                    trade_type=_trade_type(payload.order_type),
+                    volume=payload.volume,
+                    requested_price=payload.price or 0.0,
+                    actual_price=payload.price or 0.0,
+                    sl=payload.sl or None,
+                    tp=payload.tp or None,
+                    comment=payload.comment,
+                    mt5_ticket=mt5_ticket,
+                    request_time=now
                 )
-                self.active_trades[trade_id] = trade_record
+                self._index_add(trade_record)
             
             # Update with fill information
             trade_record.status = TradeStatus.FILLED
-            trade_record.actual_price = float(fill_data.get('price', trade_record.requested_price))
-            trade_record.fill_time = datetime.now()
+            trade_record.actual_price = payload.price if payload.price is not None else trade_record.requested_price
+            trade_record.fill_time = now
             trade_record.mt5_ticket = mt5_ticket
-            trade_record.commission = float(fill_data.get('commission', 0.0))
-            trade_record.swap = float(fill_data.get('swap', 0.0))
+            if mt5_ticket is not None:
+                self._by_ticket[mt5_ticket] = trade_record
+            self._ea_seq[magic_number] += 1
+            trade_record.commission = payload.commission
+            trade_record.swap = payload.swap
             
             # Calculate position size in USD
             if trade_record.actual_price > 0:
                 trade_record.position_size_usd = trade_record.volume * trade_record.actual_price * 100000
             
+            trade_record.mark_changed()
+            
             # Log the fill
-            logger.info(f"[ENTRY] Order filled: {trade_record.to_journal_format()}")
+            logger.info("[ENTRY] Order filled: %s", trade_record.to_journal_format())
             
             # Log SL/TP placement
             if trade_record.sl:
-                logger.info(f"[SL] Stop Loss clamp activated at {trade_record.sl}")
+                logger.info("[SL] Stop Loss clamp activated at %s", trade_record.sl)
             if trade_record.tp:
-                logger.info(f"[TP] Take Profit placed at {trade_record.tp}")
+                logger.info("[TP] Take Profit placed at %s", trade_record.tp)
             
             # Calculate and log Risk/Reward ratio
             if trade_record.sl and trade_record.tp and trade_record.actual_price:
@@ -483,13 +948,14 @@ class TradeRecordingService:
                 reward_pips = abs(trade_record.tp - trade_record.actual_price)
                 if risk_pips > 0:
                     rr_ratio = reward_pips / risk_pips
-                    logger.info(f"[RR] Risk/Reward ratio: 1:{rr_ratio:.1f}")
+                    logger.info("[RR] Risk/Reward ratio: 1:%.1f", rr_ratio)
             
             # Store in database
             await self._store_trade_record(trade_record)
             
             # Broadcast to dashboard
-            await self._broadcast_trade_update(trade_record, "filled")
+            self._broadcast_trade_update(trade_record, "filled")
+            self._request_ea_update()
             
             return True
             
@@ -512,13 +978,13 @@ class TradeRecordingService:
             mt5_ticket = close_data.get('ticket')
             symbol = close_data.get('symbol')
             
-            # Find matching trade record
-            trade_record = None
-            for trade_id, record in self.active_trades.items():
-                if ((record.magic_number == magic_number and record.symbol == symbol) or
-                    (mt5_ticket and record.mt5_ticket == mt5_ticket)):
-                    trade_record = record
-                    break
+            # Find matching trade record: by ticket first, then by EA and symbol
+            trade_record = self._by_ticket.get(mt5_ticket) if mt5_ticket else None
+            if not trade_record:
+                for record in self._by_magic.get(magic_number, {}).values():
+                    if record.symbol == symbol:
+                        trade_record = record
+                        break
             
             if not trade_record:
                 logger.warning(f"No matching trade found for close: magic={magic_number}, ticket={mt5_ticket}")
@@ -530,24 +996,25 @@ class TradeRecordingService:
             trade_record.profit = float(close_data.get('profit', 0.0))
             trade_record.commission += float(close_data.get('commission', 0.0))
             trade_record.swap += float(close_data.get('swap', 0.0))
+            trade_record.mark_changed()
             
             # Calculate net profit
             net_profit = trade_record.profit - trade_record.commission - trade_record.swap
             
             # Log the close
             close_price = close_data.get('close_price', 'Market')
-            logger.info(f"[CLOSE] Position closed: {trade_record.symbol} @ {close_price} (P/L: {net_profit:.2f})")
+            logger.info("[CLOSE] Position closed: %s @ %s (P/L: %.2f)", trade_record.symbol, close_price, net_profit)
             
             # Move to history
-            self.trade_history.append(trade_record)
-            if trade_record.trade_id in self.active_trades:
-                del self.active_trades[trade_record.trade_id]
+            self._append_history(trade_record)
+            self._index_remove(trade_record)
             
             # Store in database
             await self._store_trade_record(trade_record)
             
             # Broadcast to dashboard
-            await self._broadcast_trade_update(trade_record, "closed")
+            self._broadcast_trade_update(trade_record, "closed")
+            self._request_ea_update()
             
             return True
             
@@ -569,13 +1036,14 @@ class TradeRecordingService:
             magic_number = cancel_data.get('magic_number')
             order_id = cancel_data.get('order_id')
             
-            # Find matching trade record
-            trade_record = None
-            for trade_id, record in self.active_trades.items():
-                if (record.magic_number == magic_number and 
-                    (record.trade_id == order_id or record.dashboard_command_id == order_id)):
-                    trade_record = record
-                    break
+            # Find matching trade record by trade ID, then by dashboard command ID
+            trade_record = self.active_trades.get(order_id)
+            if not trade_record or trade_record.magic_number != magic_number:
+                trade_record = None
+                for record in self._by_magic.get(magic_number, {}).values():
+                    if record.dashboard_command_id == order_id:
+                        trade_record = record
+                        break
             
             if not trade_record:
                 logger.warning(f"No matching trade found for cancellation: magic={magic_number}, order={order_id}")
@@ -584,20 +1052,20 @@ class TradeRecordingService:
             # Update status
             trade_record.status = TradeStatus.CANCELLED
             trade_record.close_time = datetime.now()
+            trade_record.mark_changed()
             
             # Log the cancellation
-            logger.info(f"[CANCEL] Order cancelled: {trade_record.to_journal_format()}")
+            logger.info("[CANCEL] Order cancelled: %s", trade_record.to_journal_format())
             
             # Move to history
-            self.trade_history.append(trade_record)
-            if trade_record.trade_id in self.active_trades:
-                del self.active_trades[trade_record.trade_id]
+            self._append_history(trade_record)
+            self._index_remove(trade_record)
             
             # Store in database
             await self._store_trade_record(trade_record)
             
             # Broadcast to dashboard
-            await self._broadcast_trade_update(trade_record, "cancelled")
+            self._broadcast_trade_update(trade_record, "cancelled")
             
             return True
             
@@ -605,24 +1073,143 @@ class TradeRecordingService:
             logger.error(f"Error recording trade cancellation: {e}")
             return False
     
+    def _index_add(self, trade_record: TradeRecord):
+        """Add a trade to active_trades and its secondary indexes"""
+        previous = self.active_trades.get(trade_record.trade_id)
+        if previous is not None:
+            self._index_remove(previous)
+        
+        self.active_trades[trade_record.trade_id] = trade_record
+        self._adjust_ea_statistics(trade_record.magic_number, active=1)
+        self._by_magic[trade_record.magic_number][trade_record.trade_id] = trade_record
+        
+        if trade_record.mt5_ticket is not None:
+            self._by_ticket[trade_record.mt5_ticket] = trade_record
+        if trade_record.status == TradeStatus.PENDING:
+            self._pending_by_magic_symbol[(trade_record.magic_number, trade_record.symbol)].append(trade_record)
+    
+    def _index_remove(self, trade_record: TradeRecord):
+        """Remove a trade from active_trades and its secondary indexes"""
+        if self.active_trades.get(trade_record.trade_id) is trade_record:
+            del self.active_trades[trade_record.trade_id]
+            self._adjust_ea_statistics(trade_record.magic_number, active=-1)
+        
+        ea_trades = self._by_magic.get(trade_record.magic_number)
+        if ea_trades is not None:
+            ea_trades.pop(trade_record.trade_id, None)
+            if not ea_trades:
+                del self._by_magic[trade_record.magic_number]
+        
+        if trade_record.mt5_ticket is not None and self._by_ticket.get(trade_record.mt5_ticket) is trade_record:
+            del self._by_ticket[trade_record.mt5_ticket]
+        # Pending queues are cleaned lazily in _pop_pending
+    
+    def _pop_pending(self, magic_number: int, symbol: str) -> Optional[TradeRecord]:
+        """Pop the oldest still-pending active trade for an EA and symbol"""
+        key = (magic_number, symbol)
+        queue = self._pending_by_magic_symbol.get(key)
+        if queue is None:
+            return None
+        
+        trade_record = None
+        while queue:
+            record = queue.popleft()
+            if record.status == TradeStatus.PENDING and self.active_trades.get(record.trade_id) is record:
+                trade_record = record
+                break
+        
+        if not queue:
+            del self._pending_by_magic_symbol[key]
+        
+        return trade_record
+    
+    def clear_ea_trades(self, magic_number: int) -> int:
+        """Remove all active and historical trades for an EA, returning the active count removed"""
+        ea_trades = list(self._by_magic.get(magic_number, {}).values())
+        for trade_record in ea_trades:
+            self._index_remove(trade_record)
+        
+        for key in [k for k in self._pending_by_magic_symbol if k[0] == magic_number]:
+            del self._pending_by_magic_symbol[key]
+        
+        self.trade_history = deque(
+            (t for t in self.trade_history if t.magic_number != magic_number),
+            maxlen=_HISTORY_MAX_RECORDS
+        )
+        self._history_columns.remove_magic(magic_number)
+        self._evicted_totals.pop(magic_number, None)
+        
+        keep = [i for i, t in enumerate(self._history_by_recent) if t.magic_number != magic_number]
+        self._history_by_recent = [self._history_by_recent[i] for i in keep]
+        self._history_keys = [self._history_keys[i] for i in keep]
+        
+        self._ea_seq[magic_number] += 1
+        ea_record = self.registered_eas.get(magic_number)
+        if ea_record is not None:
+            ea_record.active_trades = 0
+            ea_record.total_trades = 0
+            ea_record.total_profit = 0.0
+            ea_record.mark_changed()
+        
+        return len(ea_trades)
+    
+    def _append_history(self, trade_record: TradeRecord):
+        """Append a finished trade to trade_history and its column mirror"""
+        if len(self.trade_history) == self.trade_history.maxlen:
+            self._evict_history(self.trade_history[0])
+        self.trade_history.append(trade_record)
+        self._history_columns.append(trade_record.magic_number, trade_record.profit, trade_record.status)
+        
+        key = -(trade_record.close_time or trade_record.request_time).timestamp()
+        index = bisect.bisect_right(self._history_keys, key)
+        self._history_keys.insert(index, key)
+        self._history_by_recent.insert(index, trade_record)
+        
+        closed_profit = trade_record.profit if trade_record.status == TradeStatus.CLOSED else 0.0
+        self._adjust_ea_statistics(trade_record.magic_number, total=1, profit=closed_profit)
+    
+    def _evict_history(self, trade_record: TradeRecord):
+        """Forget the oldest in-memory trade; it is already stored in the database"""
+        # Columns are in trade_history order, so the evicted trade is their first row
+        self._history_columns.popleft()
+        
+        # Fold it into the EA's evicted totals; statistics and summaries are unchanged
+        magic_number = trade_record.magic_number
+        count, stats = self._evicted_totals.get(magic_number, (0, _NO_CLOSED_STATS))
+        if trade_record.status == TradeStatus.CLOSED:
+            p = trade_record.profit
+            stats = _merge_closed_stats(stats, (p, max(p, 0.0), max(-p, 0.0), int(p > 0), int(p < 0), 1, p, p))
+        self._evicted_totals[magic_number] = (count + 1, stats)
+        
+        # The oldest trade sits at or near the end of the recency-ordered list
+        for index in range(len(self._history_by_recent) - 1, -1, -1):
+            if self._history_by_recent[index] is trade_record:
+                del self._history_by_recent[index]
+                del self._history_keys[index]
+                break
+    
     def get_active_trades(self, magic_number: Optional[int] = None) -> List[TradeRecord]:
         """Get active trades, optionally filtered by magic number"""
         if magic_number:
-            return [trade for trade in self.active_trades.values() if trade.magic_number == magic_number]
+            return list(self._by_magic.get(magic_number, {}).values())
         return list(self.active_trades.values())
     
     def get_trade_history(self, magic_number: Optional[int] = None, limit: int = 50) -> List[TradeRecord]:
         """Get trade history, optionally filtered by magic number"""
-        history = self.trade_history
-        if magic_number:
-            history = [trade for trade in history if trade.magic_number == magic_number]
+        # History is kept ordered by close time (most recent first)
+        if not magic_number:
+            return self._history_by_recent[:limit]
         
-        # Sort by close time (most recent first) and limit
-        history.sort(key=lambda x: x.close_time or x.request_time, reverse=True)
-        return history[:limit]
+        history = []
+        for trade in self._history_by_recent:
+            if len(history) >= limit:
+                break
+            if trade.magic_number == magic_number:
+                history.append(trade)
+        return history
     
-    def get_trade_by_id(self, trade_id: str) -> Optional[TradeRecord]:
-        """Get trade by ID from active trades or history"""
+    async def get_trade_by_id(self, trade_id: str) -> Optional[TradeRecord]:
+        """Get trade by ID from active trades, history or the database"""
         if trade_id in self.active_trades:
             return self.active_trades[trade_id]
         
@@ -630,24 +1217,65 @@ class TradeRecordingService:
             if trade.trade_id == trade_id:
                 return trade
         
-        return None
+        # Trades evicted from memory are still in the database
+        try:
+            loop = asyncio.get_running_loop()
+            row = await loop.run_in_executor(None, self._load_trade_row, trade_id)
+            return TradeRecord.from_row(row) if row else None
+        except Exception as e:
+            logger.error(f"Error loading trade {trade_id} from database: {e}")
+            return None
+    
+    def _load_trade_row(self, trade_id: str) -> Optional[Tuple]:
+        """Fetch one trade row on the read connection (runs in an executor thread)"""
+        conn = self._get_read_connection()
+        with self._read_lock:
+            return conn.execute(_SELECT_BY_ID_SQL, (trade_id,)).fetchone()
     
     def get_ea_performance_summary(self, magic_number: int) -> Dict[str, Any]:
         """Get performance summary for an EA based on recorded trades"""
+        # Read-through LRU keyed by (magic_number, change counter)
+        seq = self._ea_seq.get(magic_number, 0)
+        cached = self._summary_cache.get(magic_number)
+        if cached is not None and cached[0] == seq:
+            self._summary_cache.move_to_end(magic_number)
+            return dict(cached[1])
+        
+        summary = self._compute_performance_summary(magic_number)
+        if summary:
+            self._summary_cache[magic_number] = (seq, summary)
+            self._summary_cache.move_to_end(magic_number)
+            if len(self._summary_cache) > _SUMMARY_CACHE_SIZE:
+                self._summary_cache.popitem(last=False)
+        return dict(summary)
+    
+    def _closed_stats(self, magic_number: int) -> Tuple:
+        """Closed-trade totals for one EA over every trade recorded by this service"""
+        stats = self._history_columns.closed_stats(magic_number)
+        evicted = self._evicted_totals.get(magic_number)
+        return _merge_closed_stats(stats, evicted[1]) if evicted else stats
+    
+    def _compute_performance_summary(self, magic_number: int) -> Dict[str, Any]:
+        """Calculate the performance summary for an EA"""
         try:
-            # Get all trades for this EA
-            all_trades = []
-            all_trades.extend([t for t in self.active_trades.values() if t.magic_number == magic_number])
-            all_trades.extend([t for t in self.trade_history if t.magic_number == magic_number])
-            
-            # Filter closed trades for performance calculation
-            closed_trades = [t for t in all_trades if t.status == TradeStatus.CLOSED]
-            
-            if not closed_trades:
+            # Open and pending trades only live in active_trades
+            open_trades = pending_trades = 0
+            for trade in self._by_magic.get(magic_number, {}).values():
+                status = trade.status
+                if status is TradeStatus.FILLED:
+                    open_trades += 1
+                elif status is TradeStatus.PENDING:
+                    pending_trades += 1
+            
+            # Closed trade totals come from the columnar history plus evicted trades
+            (total_profit, gross_profit, gross_loss, win_count, loss_count,
+             closed_count, largest, smallest) = self._closed_stats(magic_number)
+            
+            if not closed_count:
                 return {
                     'total_trades': 0,
-                    'open_trades': len([t for t in all_trades if t.status == TradeStatus.FILLED]),
-                    'pending_trades': len([t for t in all_trades if t.status == TradeStatus.PENDING]),
+                    'open_trades': open_trades,
+                    'pending_trades': pending_trades,
                     'total_profit': 0.0,
                     'profit_factor': 0.0,
                     'win_rate': 0.0,
@@ -657,24 +1285,17 @@ class TradeRecordingService:
                 }
             
             # Calculate metrics
-            total_profit = sum(t.profit for t in closed_trades)
-            winning_trades = [t for t in closed_trades if t.profit > 0]
-            losing_trades = [t for t in closed_trades if t.profit < 0]
-            
-            gross_profit = sum(t.profit for t in winning_trades) if winning_trades else 0
-            gross_loss = abs(sum(t.profit for t in losing_trades)) if losing_trades else 0
-            
             profit_factor = gross_profit / gross_loss if gross_loss > 0 else gross_profit
-            win_rate = (len(winning_trades) / len(closed_trades)) * 100 if closed_trades else 0
-            expected_payoff = total_profit / len(closed_trades) if closed_trades else 0
+            win_rate = (win_count / closed_count) * 100
+            expected_payoff = total_profit / closed_count
             
-            largest_win = max((t.profit for t in winning_trades), default=0.0)
-            largest_loss = min((t.profit for t in losing_trades), default=0.0)
+            largest_win = largest if win_count else 0.0
+            largest_loss = smallest if loss_count else 0.0
             
             return {
-                'total_trades': len(closed_trades),
-                'open_trades': len([t for t in all_trades if t.status == TradeStatus.FILLED]),
-                'pending_trades': len([t for t in all_trades if t.status == TradeStatus.PENDING]),
+                'total_trades': closed_count,
+                'open_trades': open_trades,
+                'pending_trades': pending_trades,
                 'total_profit': round(total_profit, 2),
                 'profit_factor': round(profit_factor, 2),
                 'win_rate': round(win_rate, 2),
@@ -692,175 +1313,328 @@ class TradeRecordingService:
     def get_trade_journal(self, magic_number: Optional[int] = None, limit: int = 20) -> List[str]:
         """Get formatted trade journal entries"""
         try:
-            # Get recent trades
-            all_trades = []
-            all_trades.extend(self.active_trades.values())
-            all_trades.extend(self.trade_history)
-            
+            # Get candidate trades
             if magic_number:
-                all_trades = [t for t in all_trades if t.magic_number == magic_number]
-            
-            # Sort by most recent activity
-            all_trades.sort(key=lambda x: x.close_time or x.fill_time or x.request_time, reverse=True)
+                active = self._by_magic.get(magic_number, {}).values()
+                history = (t for t in self.trade_history if t.magic_number == magic_number)
+            else:
+                active = self.active_trades.values()
+                history = self.trade_history
             
-            # Format as journal entries
-            journal_entries = []
-            for trade in all_trades[:limit]:
-                journal_entries.append(trade.to_journal_format())
+            # Top trades by most recent activity, without sorting everything
+            recent_trades = heapq.nlargest(limit, chain(active, history), key=_recency)
             
-            return journal_entries
+            # Journal lines are cached on each record
+            return [trade.to_journal_format() for trade in recent_trades]
             
         except Exception as e:
             logger.error(f"Error generating trade journal: {e}")
             return []
     
-    async def _store_trade_record(self, trade_record: TradeRecord):
-        """Store trade record in database"""
+    def _open_connection(self) -> sqlite3.Connection:
+        """Open a connection to the trade database with the service pragmas applied"""
         try:
-            # Store in database using direct SQL for now
-            # This avoids model import issues while providing actual persistence
-            
-            import sqlite3
+            from backend.config.environment import Config
+        except ImportError:
             from config.environment import Config
+        from pathlib import Path
+        
+        db_path = Config.get_db_path()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        
+        conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        for pragma_sql in _CONNECTION_PRAGMAS:
+            conn.execute(pragma_sql)
+        return conn
+    
+    def _get_db_connection(self) -> sqlite3.Connection:
+        """Open the persistent writer connection on first use"""
+        # Callers run on the loop and in executor threads; open exactly once
+        with self._db_open_lock:
+            if self._db_conn is None:
+                conn = self._open_connection()
+                self._ensure_schema(conn)
+                self._db_conn = conn
+                self._db_cursor = conn.cursor()
+        
+        return self._db_conn
+    
+    def _get_read_connection(self) -> sqlite3.Connection:
+        """Open the read-only connection on first use, after the schema exists"""
+        self._get_db_connection()
+        with self._db_open_lock:
+            if self._read_conn is None:
+                conn = self._open_connection()
+                conn.execute("PRAGMA query_only=ON")
+                self._read_conn = conn
+        
+        return self._read_conn
+    
+    def _ensure_schema(self, conn: sqlite3.Connection):
+        """Create the trade table and indexes once per service"""
+        if self._schema_ready:
+            return
+        conn.execute(_CREATE_TABLE_SQL)
+        self._migrate_time_columns(conn)
+        for index_sql in _INDEX_SQL:
+            conn.execute(index_sql)
+        self._schema_ready = True
+    
+    def _migrate_time_columns(self, conn: sqlite3.Connection):
+        """Rebuild trade_records with INTEGER time columns if it predates them
+        
+        Changing a declared column type needs a new table: with TEXT affinity SQLite
+        stores epoch ms as text, which sorts and compares wrongly against ISO rows.
+        """
+        columns = [(row[1], row[2].upper()) for row in conn.execute("PRAGMA table_info(trade_records)")]
+        if all(col_type == "INTEGER" for name, col_type in columns if name in _TIME_COLUMNS):
+            return
+        
+        logger.info("Migrating trade_records time columns to epoch milliseconds")
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute("ALTER TABLE trade_records RENAME TO trade_records_old")
+            conn.execute(_CREATE_TABLE_SQL)
+            new_names = {row[1] for row in conn.execute("PRAGMA table_info(trade_records)")}
+            names = [name for name, _ in columns if name in new_names]
+            time_positions = [i for i, name in enumerate(names) if name in _TIME_COLUMNS]
+            
+            rows = []
+            for row in conn.execute(f"SELECT {', '.join(names)} FROM trade_records_old"):
+                row = list(row)
+                for i in time_positions:
+                    row[i] = _to_epoch_ms(_from_db_time(row[i]))
+                rows.append(row)
+            
+            placeholders = ", ".join("?" * len(names))
+            conn.executemany(
+                f"INSERT INTO trade_records ({', '.join(names)}) VALUES ({placeholders})", rows
+            )
+            # Dropping the old table also drops its indexes; _ensure_schema recreates them
+            conn.execute("DROP TABLE trade_records_old")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        logger.info(f"Migrated {len(rows)} trade records to epoch-millisecond times")
+    
+    async def _store_trade_record(self, trade_record: TradeRecord):
+        """Queue trade record for batched storage in database"""
+        # Snapshot now: the record keeps changing after this call
+        self._pending_rows.append(trade_record.as_tuple())
+        
+        self._wake_writer()
+        
+        if self._writer_task is None or self._writer_task.done():
+            self._closing = False
+            self._writer_task = asyncio.create_task(self._flush_loop())
+    
+    def _wake_writer(self):
+        """Resolve the writer's wakeup future if it is parked"""
+        # Single consumer: wake it directly instead of going through asyncio.Queue
+        waiter = self._rows_waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+    
+    async def _flush_loop(self):
+        """Write queued trade rows to the database in batches, off the event loop"""
+        loop = asyncio.get_running_loop()
+        pending = self._pending_rows
+        
+        # Opening may migrate the schema, so keep it off the loop too
+        try:
+            await loop.run_in_executor(None, self._get_db_connection)
+        except Exception as e:
+            logger.error(f"Error opening trade records database: {e}")
+        
+        while True:
+            if not pending:
+                if self._closing:
+                    return
+                self._rows_waiter = loop.create_future()
+                try:
+                    await self._rows_waiter
+                finally:
+                    self._rows_waiter = None
+                continue
+            
+            # Give a burst of events time to coalesce into one transaction
+            if len(pending) < _WRITE_BATCH_SIZE and not self._closing:
+                await asyncio.sleep(_WRITE_FLUSH_INTERVAL)
+            
+            # This task is the only writer, so transactions never interleave
+            await loop.run_in_executor(None, self._write_rows, self._pop_batch())
+    
+    def _pop_batch(self) -> List[Tuple]:
+        """Pop up to one batch of queued rows"""
+        pending = self._pending_rows
+        return [pending.popleft() for _ in range(min(len(pending), _WRITE_BATCH_SIZE))]
+    
+    def _write_rows(self, rows: List[Tuple]):
+        """Insert or replace a batch of trade rows in one transaction"""
+        try:
+            self._get_db_connection()
+            cursor = self._db_cursor
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                # Same SQL object every batch, so the compiled statement is reused
+                cursor.executemany(_INSERT_SQL, rows)
+                cursor.execute("COMMIT")
+            except Exception:
+                cursor.execute("ROLLBACK")
+                raise
+            logger.debug("Stored %d trade record(s) in database", len(rows))
             
-            db_path = Config.get_db_path()
-            
-            # Ensure directory exists
-            from pathlib import Path
-            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            with sqlite3.connect(db_path) as conn:
-                cursor = conn.cursor()
-                
-                # Create table if it doesn't exist
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS trade_records (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        trade_id TEXT UNIQUE NOT NULL,
-                        ea_id INTEGER,
-                        magic_number INTEGER NOT NULL,
-                        symbol TEXT NOT NULL,
-                        trade_type TEXT NOT NULL,
-                        volume REAL NOT NULL,
-                        requested_price REAL,
-                        actual_price REAL,
-                        sl REAL,
-                        tp REAL,
-                        status TEXT NOT NULL,
-                        profit REAL DEFAULT 0.0,
-                        commission REAL DEFAULT 0.0,
-                        swap REAL DEFAULT 0.0,
-                        comment TEXT,
-                        request_time TEXT,
-                        fill_time TEXT,
-                        close_time TEXT,
-                        dashboard_command_id TEXT,
-                        mt5_ticket INTEGER,
-                        risk_percent REAL DEFAULT 0.0,
-                        account_balance REAL DEFAULT 0.0,
-                        position_size_usd REAL DEFAULT 0.0,
-                        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                
-                # Insert or update trade record
-                cursor.execute("""
-                    INSERT OR REPLACE INTO trade_records (
-                        trade_id, ea_id, magic_number, symbol, trade_type, volume,
-                        requested_price, actual_price, sl, tp, status, profit,
-                        commission, swap, comment, request_time, fill_time, close_time,
-                        dashboard_command_id, mt5_ticket, risk_percent, account_balance,
-                        position_size_usd
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    trade_record.trade_id,
-                    trade_record.ea_id,
-                    trade_record.magic_number,
-                    trade_record.symbol,
-                    trade_record.trade_type.value,
-                    trade_record.volume,
-                    trade_record.requested_price,
-                    trade_record.actual_price,
-                    trade_record.sl,
-                    trade_record.tp,
-                    trade_record.status.value,
-                    trade_record.profit,
-                    trade_record.commission,
-                    trade_record.swap,
-                    trade_record.comment,
-                    trade_record.request_time.isoformat() if trade_record.request_time else None,
-                    trade_record.fill_time.isoformat() if trade_record.fill_time else None,
-                    trade_record.close_time.isoformat() if trade_record.close_time else None,
-                    trade_record.dashboard_command_id,
-                    trade_record.mt5_ticket,
-                    trade_record.risk_percent,
-                    trade_record.account_balance,
-                    trade_record.position_size_usd
-                ))
-                
-                conn.commit()
-                logger.info(f"Trade record stored in database: {trade_record.trade_id}")
-                
         except Exception as e:
-            logger.error(f"Error storing trade record in database: {e}")
+            logger.error(f"Error storing trade records in database: {e}")
             # Fallback to logging only
-            logger.info(f"Trade record (fallback log): {trade_record.trade_id} - {trade_record.symbol} {trade_record.trade_type.value} {trade_record.volume}")
+            for row in rows:
+                logger.info("Trade record (fallback log): %s - %s %s %s", row[0], row[3], row[4], row[5])
     
-    async def _broadcast_trade_update(self, trade_record: TradeRecord, event_type: str):
-        """Broadcast trade update to WebSocket clients"""
+    async def close(self):
+        """Flush queued trade records and close the database connection"""
+        # Let the writer drain the queue and exit on its own
+        if self._writer_task is not None and not self._writer_task.done():
+            self._closing = True
+            self._wake_writer()
+            await self._writer_task
+        self._writer_task = None
+        
+        while self._pending_rows:
+            self._write_rows(self._pop_batch())
+        
+        if self._db_conn is not None:
+            self._db_cursor.close()
+            self._db_conn.close()
+            self._db_cursor = None
+            self._db_conn = None
+        
+        if self._read_conn is not None:
+            with self._read_lock:
+                self._read_conn.close()
+            self._read_conn = None
+    
+    def _broadcast_trade_update(self, trade_record: TradeRecord, event_type: str):
+        """Queue trade update for WebSocket clients without blocking the caller"""
         try:
-            if not self.websocket_server:
+            if self._send_trade_update is None or not self.websocket_server.has_clients:
                 return
             
-            update_data = {
-                "type": "trade_update",
-                "event": event_type,
-                "trade": trade_record.to_dict(),
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # Use asyncio to broadcast without blocking
-            import asyncio
-            asyncio.create_task(self.websocket_server.broadcast_trade_update(update_data))
+            # Newer updates for the same trade replace queued ones; the record
+            # is serialized at flush time, once per update actually sent
+            pending = self._pending_trade_updates
+            if trade_record.trade_id not in pending and len(pending) >= _BROADCAST_MAX_PENDING:
+                del pending[next(iter(pending))]
+            pending[trade_record.trade_id] = (event_type, trade_record)
+            self._schedule_broadcast()
             
         except Exception as e:
             logger.error(f"Error broadcasting trade update: {e}")
     
-    async def _broadcast_ea_update(self, ea_record: EARecord, event_type: str):
-        """Broadcast EA update to WebSocket clients"""
+    def _broadcast_ea_update(self, ea_record: EARecord, event_type: str):
+        """Queue EA update for WebSocket clients without blocking the caller"""
         try:
-            if not self.websocket_server:
+            if self._send_ea_update is None or not self.websocket_server.has_clients:
                 return
             
-            update_data = {
-                "type": "ea_update",
-                "event": event_type,
-                "ea": ea_record.to_dict(),
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            # Use asyncio to broadcast without blocking
-            import asyncio
-            asyncio.create_task(self.websocket_server.broadcast_ea_update(update_data))
+            # Newer updates for the same EA replace queued ones
+            self._pending_ea_updates[ea_record.magic_number] = (event_type, ea_record)
+            self._schedule_broadcast()
             
         except Exception as e:
             logger.error(f"Error broadcasting EA update: {e}")
     
+    def _schedule_broadcast(self):
+        """Start the broadcast flush task unless one is already pending"""
+        if self._broadcast_task is None or self._broadcast_task.done():
+            self._broadcast_task = asyncio.create_task(self._flush_broadcasts())
+    
+    async def _flush_broadcasts(self):
+        """Send coalesced trade and EA updates to WebSocket clients"""
+        await asyncio.sleep(_BROADCAST_COALESCE_SECONDS)
+        
+        trade_updates = self._pending_trade_updates
+        ea_updates = self._pending_ea_updates
+        self._pending_trade_updates = {}
+        self._pending_ea_updates = {}
+        
+        # One epoch-millisecond timestamp for every update in this flush
+        timestamp = time.time_ns() // 1_000_000
+        
+        # Trade and EA frames are independent, so they are sent concurrently
+        sends = []
+        try:
+            # A burst of trade updates goes out as one trade_batch frame
+            if len(trade_updates) == 1:
+                event_type, trade_record = next(iter(trade_updates.values()))
+                sends.append(self._send_trade_update({
+                    "type": "trade_update",
+                    "event": event_type,
+                    "trade": trade_record.to_dict(),
+                    "timestamp": timestamp
+                }))
+            elif trade_updates:
+                sends.append(self._send_trade_batch([
+                    {
+                        "event": event_type,
+                        "trade": trade_record.to_dict(),
+                        "timestamp": timestamp
+                    }
+                    for event_type, trade_record in trade_updates.values()
+                ]))
+            # Likewise for EA updates, as one ea_batch frame
+            if len(ea_updates) == 1:
+                event_type, ea_record = next(iter(ea_updates.values()))
+                sends.append(self._send_ea_update({
+                    "type": "ea_update",
+                    "event": event_type,
+                    "ea": ea_record.to_dict(),
+                    "timestamp": timestamp
+                }))
+            elif ea_updates:
+                sends.append(self._send_ea_batch([
+                    {
+                        "event": event_type,
+                        "ea": ea_record.to_dict(),
+                        "timestamp": timestamp
+                    }
+                    for event_type, ea_record in ea_updates.values()
+                ]))
+        except Exception as e:
+            logger.error(f"Error building dashboard updates: {e}")
+        
+        for result in await asyncio.gather(*sends, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.error(f"Error broadcasting dashboard updates: {result}")
+        
+        # Updates queued while sending are picked up by a follow-up flush
+        if self._pending_trade_updates or self._pending_ea_updates:
+            self._broadcast_task = asyncio.create_task(self._flush_broadcasts())
+    
     def get_account_overview(self) -> Dict[str, Any]:
         """Get comprehensive account overview with all EAs"""
         try:
             active_eas = self.get_active_eas()
             
-            # Calculate totals
-            total_balance = max((ea.balance for ea in active_eas), default=0.0)
-            total_equity = max((ea.equity for ea in active_eas), default=0.0)
-            total_margin = sum(ea.margin for ea in active_eas)
-            total_free_margin = max((ea.free_margin for ea in active_eas), default=0.0)
-            
-            # Calculate overall statistics
-            total_active_trades = sum(ea.active_trades for ea in active_eas)
-            total_completed_trades = sum(ea.total_trades for ea in active_eas)
-            total_profit = sum(ea.total_profit for ea in active_eas)
+            # Calculate totals and overall statistics in one pass
+            total_balance = total_equity = total_free_margin = float('-inf') if active_eas else 0.0
+            total_margin = total_profit = 0.0
+            total_active_trades = total_completed_trades = 0
+            ea_list = []
+            
+            for ea in active_eas:
+                # Balance, equity and free margin are account-wide, so take the max
+                if ea.balance > total_balance:
+                    total_balance = ea.balance
+                if ea.equity > total_equity:
+                    total_equity = ea.equity
+                if ea.free_margin > total_free_margin:
+                    total_free_margin = ea.free_margin
+                total_margin += ea.margin
+                total_active_trades += ea.active_trades
+                total_completed_trades += ea.total_trades
+                total_profit += ea.total_profit
+                ea_list.append(ea.to_dict())
             
             # Get account info from first active EA
             account_info = {}
@@ -887,8 +1661,8 @@ class TradeRecordingService:
                     'completed_trades': total_completed_trades,
                     'total_profit': round(total_profit, 2)
                 },
-                'ea_list': [ea.to_dict() for ea in active_eas],
-                'timestamp': datetime.now().isoformat()
+                'ea_list': ea_list,
+                'timestamp': time.time_ns() // 1_000_000
             }
             
         except Exception as e:
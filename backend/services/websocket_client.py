@@ -7,6 +7,7 @@ for frontend implementation.
 """
 
 import asyncio
+import inspect
 import json
 import logging
 from typing import Dict, List, Callable, Optional
@@ -14,13 +15,33 @@ import websockets
 from websockets.client import WebSocketClientProtocol
 from websockets.exceptions import ConnectionClosed, WebSocketException
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
 
 logger = logging.getLogger(__name__)
 
 
+if orjson is not None:
+    def _dumps(obj) -> str:
+        """Encode with orjson, sent as a text frame like json.dumps output"""
+        return orjson.dumps(obj).decode("utf-8")
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    _loads = orjson.loads
+else:
+    _dumps = json.dumps
+    _loads = json.loads
+
+
 class WebSocketClient:
     """WebSocket client for testing and integration"""
     
+    # Heartbeats carry no data, so the frame is encoded once
+    _HEARTBEAT_MESSAGE = _dumps({"type": "heartbeat", "data": {}})
+    
     def __init__(self, uri: str, auth_token: str = "dashboard_token"):
         self.uri = uri
         self.auth_token = auth_token
@@ -64,7 +85,7 @@ class WebSocketClient:
             "data": {"token": self.auth_token}
         }
         
-        await self.websocket.send(json.dumps(auth_message))
+        await self.websocket.send(_dumps(auth_message))
         logger.info("Authentication request sent")
     
     async def subscribe(self, channels: List[str]):
@@ -77,7 +98,7 @@ class WebSocketClient:
             "data": {"channels": channels}
         }
         
-        await self.websocket.send(json.dumps(subscribe_message))
+        await self.websocket.send(_dumps(subscribe_message))
         self.subscriptions.update(channels)
         logger.info(f"Subscribed to channels: {channels}")
     
@@ -91,7 +112,7 @@ class WebSocketClient:
             "data": {"channels": channels}
         }
         
-        await self.websocket.send(json.dumps(unsubscribe_message))
+        await self.websocket.send(_dumps(unsubscribe_message))
         for channel in channels:
             self.subscriptions.discard(channel)
         logger.info(f"Unsubscribed from channels: {channels}")
@@ -101,40 +122,18 @@ class WebSocketClient:
         if not self.websocket:
             return
         
-        heartbeat_message = {
-            "type": "heartbeat",
-            "data": {}
-        }
-        
-        await self.websocket.send(json.dumps(heartbeat_message))
+        await self.websocket.send(self._HEARTBEAT_MESSAGE)
     
     async def message_handler(self):
         """Handle incoming messages from server"""
         try:
             async for message in self.websocket:
-                try:
-                    data = json.loads(message)
-                    message_type = data.get("type")
-                    payload = data.get("data", {})
-                    
-                    # Handle authentication response
-                    if message_type == "auth_response":
-                        if payload.get("status") == "authenticated":
-                            self.authenticated = True
-                            logger.info("Authentication successful")
-                        else:
-                            logger.error(f"Authentication failed: {payload.get('message')}")
-                    
-                    # Call registered message handler
-                    if message_type in self.message_handlers:
-                        await self.message_handlers[message_type](payload)
-                    
-                    logger.debug(f"Received message: {message_type}")
-                    
-                except json.JSONDecodeError:
-                    logger.error(f"Invalid JSON received: {message}")
-                except Exception as e:
-                    logger.error(f"Error handling message: {e}")
+                # Batched broadcast frames carry newline-delimited JSON messages
+                if isinstance(message, str) and "\n" in message:
+                    for line in message.split("\n"):
+                        await self._handle_message(line)
+                else:
+                    await self._handle_message(message)
                     
         except ConnectionClosed:
             logger.info("Connection closed by server")
@@ -145,6 +144,38 @@ class WebSocketClient:
         finally:
             self.running = False
     
+    async def _handle_message(self, message: str):
+        """Decode a single message and pass it to its registered handler"""
+        try:
+            data = _loads(message)
+            message_type = data.get("type")
+            payload = data.get("data", {})
+            
+            # Handle authentication response
+            if message_type == "auth_response":
+                if payload.get("status") == "authenticated":
+                    self.authenticated = True
+                    logger.info("Authentication successful")
+                else:
+                    logger.error(f"Authentication failed: {payload.get('message')}")
+            
+            # Call registered message handler
+            handler = self.message_handlers.get(message_type)
+            if handler is not None:
+                # Checked on the result, so partials and wrappers around
+                # async functions are awaited too
+                result = handler(payload)
+                if inspect.isawaitable(result):
+                    await result
+            
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Received message: %s", message_type)
+            
+        except json.JSONDecodeError:
+            logger.error(f"Invalid JSON received: {message}")
+        except Exception as e:
+            logger.error(f"Error handling message: {e}")
+    
     async def heartbeat_task(self):
         """Send periodic heartbeats to server"""
         while self.running:
@@ -156,7 +187,7 @@ class WebSocketClient:
                 break
     
     def register_message_handler(self, message_type: str, handler: Callable):
-        """Register a handler for specific message type"""
+        """Register a sync or async handler for specific message type"""
         self.message_handlers[message_type] = handler
         logger.info(f"Registered handler for message type: {message_type}")
     
@@ -236,5 +267,12 @@ if __name__ == "__main__":
     # Configure logging
     logging.basicConfig(level=logging.INFO)
     
+    # Prefer uvloop when installed (not available on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     # Run test
     asyncio.run(test_client_connection())
\ No newline at end of file
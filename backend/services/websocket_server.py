@@ -7,19 +7,115 @@ Provides WebSocket communication for real-time updates between dashboard and bac
 import asyncio
 import json
 import logging
+import random
+import socket
+import struct
+import sys
+import time
+import zlib
 import websockets
+from collections import OrderedDict
 from datetime import datetime
-from typing import Dict, Set, Any, Optional, List
+from typing import Awaitable, Callable, Dict, Set, Any, Optional, List, Tuple, Union
+from websockets.extensions.permessage_deflate import PerMessageDeflate, ServerPerMessageDeflateFactory
+from websockets.frames import Frame, Opcode
 from websockets.server import WebSocketServerProtocol
 import threading
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger(__name__)
 
+# Trailing empty block that permessage-deflate strips from each message
+_EMPTY_UNCOMPRESSED_BLOCK = b"\x00\x00\xff\xff"
+
+# Broadcast messages queued per client before further ones are dropped
+_CLIENT_QUEUE_SIZE = 256
+
+# Clients written per slice of a large broadcast before yielding to the event loop
+_BROADCAST_SLICE = 50
+
+# Inbound frames are decoded with orjson when installed; orjson.JSONDecodeError
+# subclasses json.JSONDecodeError, so process_message's handling still applies
+_loads = orjson.loads if orjson is not None else json.loads
+
+# Last ISO timestamp handed out and the wall-clock millisecond it belongs to
+_now_iso_cache = [0, ""]
+
+
+def _now_iso() -> str:
+    """Current local time in ISO format, reused for calls within the same millisecond"""
+    ms = time.time_ns() // 1_000_000
+    if ms != _now_iso_cache[0]:
+        _now_iso_cache[0] = ms
+        _now_iso_cache[1] = datetime.now().isoformat()
+    return _now_iso_cache[1]
+
+
+# Base quotes for mock price data sent on price subscription
+_MOCK_BASE_PRICES = {
+    'EURUSD': 1.0847,
+    'GBPUSD': 1.2634,
+    'USDJPY': 149.82,
+    'USDCHF': 0.8756,
+    'AUDUSD': 0.6523,
+    'USDCAD': 1.3789,
+    'NZDUSD': 0.5987,
+    'XAUUSD': 2034.67
+}
+
+
+def _mock_variation_range(symbol: str) -> Tuple[float, float]:
+    """Random variation range for a mock quote of symbol"""
+    if symbol == 'XAUUSD':
+        return (-5.0, 5.0)
+    if 'JPY' in symbol:
+        return (-0.1, 0.1)
+    return (-0.002, 0.002)
+
+
+# Variation ranges for the known symbols, classified once
+_MOCK_VARIATION_RANGES = {symbol: _mock_variation_range(symbol) for symbol in _MOCK_BASE_PRICES}
+
+
+def _compressed_text_frame(payload: bytes) -> bytes:
+    """Serialize an unmasked server text frame with RSV1 set for a deflated payload
+    
+    Built by hand because Frame.serialize() rejects reserved bits unless the
+    extension that set them is passed in.
+    """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0xC1, length)
+    elif length < 65536:
+        header = struct.pack("!BBH", 0xC1, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0xC1, 127, length)
+    return header + payload
+
+
+def _orjson_dumps(obj: Any) -> str:
+    """Encode with orjson, keeping text frames for existing clients"""
+    return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+
 
 class WebSocketServer:
     """WebSocket server for real-time communication"""
     
-    def __init__(self, host: str = None, port: int = None, auth_token: str = None):
+    def __init__(self, host: str = None, port: int = None, auth_token: str = None,
+                 batch_window_ms: int = 0, batch_max_bytes: int = 64 * 1024,
+                 writer_limit: int = 2 ** 16, max_queue: int = 32, reuse_port: bool = False,
+                 json_backend: str = "orjson",
+                 prepared_cache_mb: int = 0, tcp_nodelay: bool = False, tcp_keepalive: bool = False,
+                 compression: bool = False):
         # Import config here to avoid circular imports
         try:
             from config.environment import Config
@@ -36,28 +132,141 @@ class WebSocketServer:
             self.port = port or WS_PORT
             self.auth_token = auth_token or "dashboard_token_2024"
         
+        # JSON encoder for outbound frames; falls back to stdlib without orjson
+        if json_backend == "orjson" and orjson is not None:
+            self._dumps = _orjson_dumps
+        else:
+            self._dumps = json.dumps
+        
+        # Incoming message handlers by message type
+        self._handlers = {
+            "auth": self.handle_auth,
+            "subscribe": self.handle_subscribe,
+            "subscribe_prices": self.handle_subscribe_prices,
+            "unsubscribe_prices": self.handle_unsubscribe_prices,
+            "heartbeat": self.handle_heartbeat,
+            "ping": self.handle_ping,
+        }
+        
+        # Response skeletons built once; handlers fill the dynamic data slots
+        # and serialize before the next await, so sharing them is safe
+        self._auth_ok_response = {
+            "type": "auth_response",
+            "data": {"status": "authenticated", "encoding": None, "timestamp": None}
+        }
+        self._auth_failed_response = {
+            "type": "auth_response",
+            "data": {"status": "failed", "error": "Invalid token", "timestamp": None}
+        }
+        self._subscribe_response = {
+            "type": "subscribe_response",
+            "data": {"status": "subscribed", "channels": None, "timestamp": None}
+        }
+        self._heartbeat_response = {
+            "type": "heartbeat_response",
+            "data": {"timestamp": None, "server_time": None}
+        }
+        self._pong_response = {
+            "type": "pong",
+            "data": {"timestamp": None, "original_data": None}
+        }
+        self._error_response = {
+            "type": "error",
+            "data": {"message": None, "timestamp": None}
+        }
+        self._not_authenticated_frame = self._dumps({
+            "type": "error",
+            "data": {"message": "Not authenticated"}
+        })
+        
         # Connected clients
         self.clients: Set[WebSocketServerProtocol] = set()
         self.authenticated_clients: Set[WebSocketServerProtocol] = set()
         
+        # Authenticated clients that asked for binary msgpack trade updates
+        self.msgpack_clients: Set[WebSocketServerProtocol] = set()
+        
         # Server instance
         self.server = None
         self.running = False
         
+        # Set once the server has stopped so owners can await its lifetime
+        self.stopped_event = asyncio.Event()
+        
+        # Outbound broadcast batching (disabled when the window is 0).
+        # Batched frames carry newline-delimited JSON messages.
+        self.batch_window = batch_window_ms / 1000
+        self.batch_max_bytes = batch_max_bytes
+        self._batch_buffers: Dict[WebSocketServerProtocol, bytearray] = {}
+        self._batch_timers: Dict[WebSocketServerProtocol, asyncio.TimerHandle] = {}
+        
+        # Backpressure: per-connection write buffer high-water mark and
+        # incoming message queue depth (websockets defaults)
+        self.writer_limit = writer_limit
+        self.max_queue = max_queue
+        
+        # SO_REUSEPORT lets several worker processes share one listening port
+        self.reuse_port = reuse_port
+        
+        # TCP options set on the listening socket and re-applied on accept
+        self.tcp_nodelay = tcp_nodelay
+        self.tcp_keepalive = tcp_keepalive
+        
+        # Prepared broadcast frames: each payload is compressed once and the
+        # serialized frame is shared by every client negotiated without
+        # context takeover. 0 disables the cache.
+        self.prepared_cache_bytes = prepared_cache_mb << 20
+        self._prepared_frames: "OrderedDict[Tuple[str, int], bytes]" = OrderedDict()
+        self._prepared_frames_size = 0
+        
+        # Per-client permessage-deflate; off by default since most frames are
+        # small JSON, and the prepared cache brings its own shared compression
+        self.compression = compression
+        
+        # Per-client outbound queues drained by one sender task each, used when
+        # broadcasts are batched or pre-compressed and sends have to be awaited
+        self._send_queues: Dict[WebSocketServerProtocol, asyncio.Queue] = {}
+        self._send_tasks: Dict[WebSocketServerProtocol, asyncio.Task] = {}
+    
+    @property
+    def has_clients(self) -> bool:
+        """Whether any authenticated client would receive a broadcast"""
+        return bool(self.authenticated_clients)
+        
     async def start_server(self):
         """Start the WebSocket server"""
         try:
             logger.info(f"Starting WebSocket server on {self.host}:{self.port}")
             
+            serve_kwargs = {"host": self.host, "port": self.port}
+            if self.tcp_nodelay or self.tcp_keepalive:
+                # Build the listener ourselves so socket options are in place before accept
+                serve_kwargs = {"sock": self._create_listen_socket()}
+            elif self.reuse_port:
+                serve_kwargs["reuse_port"] = True
+            if self.prepared_cache_bytes:
+                # Stateless compression so one compressed frame is valid for every client
+                serve_kwargs["extensions"] = [
+                    ServerPerMessageDeflateFactory(
+                        server_no_context_takeover=True,
+                        server_max_window_bits=12,
+                        compress_settings={"memLevel": 5},
+                    )
+                ]
+            elif not self.compression:
+                serve_kwargs["compression"] = None
+            
             self.server = await websockets.serve(
                 self.handle_client,
-                self.host,
-                self.port,
                 ping_interval=30,
-                ping_timeout=10
+                ping_timeout=10,
+                write_limit=self.writer_limit,
+                max_queue=self.max_queue,
+                **serve_kwargs
             )
             
             self.running = True
+            self.stopped_event.clear()
             logger.info(f"✅ WebSocket server started on ws://{self.host}:{self.port}")
             
             # Start price updates in background
@@ -72,6 +281,42 @@ class WebSocketServer:
         except Exception as e:
             logger.error(f"WebSocket server error: {e}")
             raise
+        finally:
+            self.stopped_event.set()
+    
+    def _create_listen_socket(self) -> socket.socket:
+        """Create and bind the listening socket with the configured options"""
+        family, sock_type, proto, _, address = socket.getaddrinfo(
+            self.host, self.port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE
+        )[0]
+        
+        sock = socket.socket(family, sock_type, proto)
+        try:
+            if sys.platform != "win32":
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            if self.reuse_port:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            self._apply_tcp_options(sock)
+            sock.bind(address)
+            sock.setblocking(False)
+        except OSError:
+            sock.close()
+            raise
+        
+        return sock
+    
+    def _apply_tcp_options(self, sock):
+        """Set TCP_NODELAY / keepalive options on a socket"""
+        if self.tcp_nodelay:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        
+        if self.tcp_keepalive:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            # Probe timings are Linux-specific
+            if hasattr(socket, "TCP_KEEPIDLE"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 60)
+            if hasattr(socket, "TCP_KEEPINTVL"):
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 10)
     
     async def stop_server(self):
         """Stop the WebSocket server"""
@@ -88,8 +333,20 @@ class WebSocketServer:
                 return_exceptions=True
             )
         
+        for timer in self._batch_timers.values():
+            timer.cancel()
+        self._batch_timers.clear()
+        self._batch_buffers.clear()
+        
+        for task in self._send_tasks.values():
+            task.cancel()
+        self._send_tasks.clear()
+        self._send_queues.clear()
+        
         self.clients.clear()
         self.authenticated_clients.clear()
+        self.msgpack_clients.clear()
+        self.stopped_event.set()
         
         logger.info("WebSocket server stopped")
     
@@ -100,6 +357,15 @@ class WebSocketServer:
         
         self.clients.add(websocket)
         
+        # Accepted sockets do not inherit listener options on every platform
+        if self.tcp_nodelay or self.tcp_keepalive:
+            client_sock = websocket.transport.get_extra_info("socket")
+            if client_sock is not None:
+                try:
+                    self._apply_tcp_options(client_sock)
+                except OSError as e:
+                    logger.debug(f"Could not set TCP options for {client_addr}: {e}")
+        
         try:
             async for message in websocket:
                 await self.process_message(websocket, message)
@@ -111,25 +377,19 @@ class WebSocketServer:
         finally:
             self.clients.discard(websocket)
             self.authenticated_clients.discard(websocket)
+            self.msgpack_clients.discard(websocket)
+            self._drop_batch(websocket)
+            self._drop_sender(websocket)
     
     async def process_message(self, websocket: WebSocketServerProtocol, message: str):
         """Process incoming message from client"""
         try:
-            data = json.loads(message)
+            data = _loads(message)
             message_type = data.get("type")
             
-            if message_type == "auth":
-                await self.handle_auth(websocket, data)
-            elif message_type == "subscribe":
-                await self.handle_subscribe(websocket, data)
-            elif message_type == "subscribe_prices":
-                await self.handle_subscribe_prices(websocket, data)
-            elif message_type == "unsubscribe_prices":
-                await self.handle_unsubscribe_prices(websocket, data)
-            elif message_type == "heartbeat":
-                await self.handle_heartbeat(websocket, data)
-            elif message_type == "ping":
-                await self.handle_ping(websocket, data)
+            handler = self._handlers.get(message_type)
+            if handler is not None:
+                await handler(websocket, data)
             else:
                 logger.debug(f"Unknown message type: {message_type}")
                 # Send error response for unknown message types
@@ -146,67 +406,49 @@ class WebSocketServer:
         token = auth_data.get("token")
         
         if token == self.auth_token:
+            # The flag gates per-message handlers; the set drives broadcast fan-out
+            websocket.authenticated = True
             self.authenticated_clients.add(websocket)
-            response = {
-                "type": "auth_response",
-                "data": {
-                    "status": "authenticated",
-                    "timestamp": datetime.now().isoformat()
-                }
-            }
+            
+            # Trade updates can be sent as binary msgpack frames on request
+            encoding = "json"
+            if auth_data.get("encoding") == "msgpack" and msgpack is not None:
+                self.msgpack_clients.add(websocket)
+                encoding = "msgpack"
+            
+            frame = self._render(self._auth_ok_response, encoding=encoding,
+                                 timestamp=_now_iso())
             logger.info(f"Client authenticated: {websocket.remote_address}")
         else:
-            response = {
-                "type": "auth_response",
-                "data": {
-                    "status": "failed",
-                    "error": "Invalid token",
-                    "timestamp": datetime.now().isoformat()
-                }
-            }
+            frame = self._render(self._auth_failed_response, timestamp=_now_iso())
             logger.warning(f"Authentication failed for client: {websocket.remote_address}")
         
-        await websocket.send(json.dumps(response))
+        await websocket.send(frame)
     
     async def handle_subscribe(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
         """Handle subscription request"""
-        if websocket not in self.authenticated_clients:
-            await websocket.send(json.dumps({
-                "type": "error",
-                "data": {"message": "Not authenticated"}
-            }))
+        if not getattr(websocket, "authenticated", False):
+            await websocket.send(self._not_authenticated_frame)
             return
         
         subscribe_data = data.get("data", {})
         channels = subscribe_data.get("channels", [])
         
-        response = {
-            "type": "subscribe_response",
-            "data": {
-                "status": "subscribed",
-                "channels": channels,
-                "timestamp": datetime.now().isoformat()
-            }
-        }
+        frame = self._render(self._subscribe_response, channels=channels,
+                             timestamp=_now_iso())
         
-        await websocket.send(json.dumps(response))
+        await websocket.send(frame)
         logger.info(f"Client subscribed to channels: {channels}")
     
     async def handle_heartbeat(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
         """Handle heartbeat request"""
-        response = {
-            "type": "heartbeat_response",
-            "data": {
-                "timestamp": datetime.now().isoformat(),
-                "server_time": datetime.now().isoformat()
-            }
-        }
+        now = _now_iso()
         
-        await websocket.send(json.dumps(response))
+        await websocket.send(self._render(self._heartbeat_response, timestamp=now, server_time=now))
     
     async def handle_subscribe_prices(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
         """Handle price subscription request"""
-        if websocket not in self.authenticated_clients:
+        if not getattr(websocket, "authenticated", False):
             await self.send_error(websocket, "Not authenticated")
             return
         
@@ -221,11 +463,11 @@ class WebSocketServer:
                 "status": "subscribed",
                 "symbols": symbols,
                 "message": "Price subscription acknowledged (mock data will be sent)",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         }
         
-        await websocket.send(json.dumps(response))
+        await websocket.send(self._dumps(response))
         logger.debug(f"Client subscribed to price updates for symbols: {symbols}")
         
         # Send mock price data immediately
@@ -233,7 +475,7 @@ class WebSocketServer:
     
     async def handle_unsubscribe_prices(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
         """Handle price unsubscription request"""
-        if websocket not in self.authenticated_clients:
+        if not getattr(websocket, "authenticated", False):
             await self.send_error(websocket, "Not authenticated")
             return
         
@@ -245,118 +487,47 @@ class WebSocketServer:
             "data": {
                 "status": "unsubscribed",
                 "symbols": symbols,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         }
         
-        await websocket.send(json.dumps(response))
+        await websocket.send(self._dumps(response))
         logger.debug(f"Client unsubscribed from price updates for symbols: {symbols}")
     
     async def handle_ping(self, websocket: WebSocketServerProtocol, data: Dict[str, Any]):
         """Handle ping request"""
-        response = {
-            "type": "pong",
-            "data": {
-                "timestamp": datetime.now().isoformat(),
-                "original_data": data.get("data", {})
-            }
-        }
+        frame = self._render(self._pong_response, timestamp=_now_iso(),
+                             original_data=data.get("data", {}))
         
-        await websocket.send(json.dumps(response))
+        await websocket.send(frame)
+    
+    def _render(self, template: Dict[str, Any], **fields) -> str:
+        """Fill a response template's data slots and serialize it
+        
+        The shared template is left untouched, so no client's values outlive its response.
+        """
+        return self._dumps({**template, "data": {**template["data"], **fields}})
     
     async def send_error(self, websocket: WebSocketServerProtocol, error_message: str):
         """Send error response to client"""
-        error_response = {
-            "type": "error",
-            "data": {
-                "message": error_message,
-                "timestamp": datetime.now().isoformat()
-            }
-        }
+        frame = self._render(self._error_response, message=error_message,
+                             timestamp=_now_iso())
         
         try:
-            await websocket.send(json.dumps(error_response))
+            await websocket.send(frame)
         except Exception as e:
             logger.error(f"Failed to send error response: {e}")
     
-    async def send_mock_prices(self, websocket: WebSocketServerProtocol, symbols: list):
-        """Send current price data to client"""
-        try:
-            # Try to use price service
-            from services.mt5_price_service import get_mt5_price_service
-            price_service = get_mt5_price_service()
-            
-            if not symbols:
-                symbols = price_service.get_all_symbols()[:8]  # Limit to first 8 symbols
-            
-            # Get current prices from service
-            prices = price_service.get_prices(symbols)
-            
-            # Convert to format expected by frontend
-            price_data = {}
-            for symbol, price in prices.items():
-                price_data[symbol] = {
-                    "bid": price.bid,
-                    "ask": price.ask,
-                    "spread": price.spread
-                }
-            
-        except ImportError:
-            # Fallback to static mock data
-            if not symbols:
-                symbols = ["EURUSD", "GBPUSD", "USDJPY", "AUDUSD"]
-            
-            mock_prices = {
-                "EURUSD": {"bid": 1.0847, "ask": 1.0849, "spread": 0.0002},
-                "GBPUSD": {"bid": 1.2634, "ask": 1.2636, "spread": 0.0002},
-                "USDJPY": {"bid": 149.82, "ask": 149.84, "spread": 0.02},
-                "AUDUSD": {"bid": 0.6523, "ask": 0.6525, "spread": 0.0002}
-            }
-            
-            price_data = {symbol: mock_prices.get(symbol, {"bid": 1.0000, "ask": 1.0002, "spread": 0.0002}) 
-                         for symbol in symbols}
-        
-        price_update = {
-            "type": "price_update",
-            "data": {
-                "prices": price_data,
-                "timestamp": datetime.now().isoformat()
-            }
-        }
-        
-        try:
-            await websocket.send(json.dumps(price_update))
-        except Exception as e:
-            logger.error(f"Failed to send prices: {e}")
-    
     async def send_mock_prices(self, websocket: WebSocketServerProtocol, symbols: List[str]):
         """Send mock price data to client"""
-        import random
-        
-        # Mock price data for common symbols
-        base_prices = {
-            'EURUSD': 1.0847,
-            'GBPUSD': 1.2634,
-            'USDJPY': 149.82,
-            'USDCHF': 0.8756,
-            'AUDUSD': 0.6523,
-            'USDCAD': 1.3789,
-            'NZDUSD': 0.5987,
-            'XAUUSD': 2034.67
-        }
-        
         price_data = {}
         
         for symbol in symbols:
-            base_price = base_prices.get(symbol, 1.0000)
+            base_price = _MOCK_BASE_PRICES.get(symbol, 1.0000)
             
             # Add small random variation
-            if symbol == 'XAUUSD':
-                variation = random.uniform(-5.0, 5.0)
-            elif 'JPY' in symbol:
-                variation = random.uniform(-0.1, 0.1)
-            else:
-                variation = random.uniform(-0.002, 0.002)
+            low, high = _MOCK_VARIATION_RANGES.get(symbol) or _mock_variation_range(symbol)
+            variation = random.uniform(low, high)
             
             current_price = base_price + variation
             
@@ -364,7 +535,7 @@ class WebSocketServer:
                 'symbol': symbol,
                 'bid': round(current_price - 0.0001, 5),
                 'ask': round(current_price + 0.0001, 5),
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': _now_iso(),
                 'change': round(variation, 5),
                 'change_percent': round((variation / base_price) * 100, 3)
             }
@@ -373,78 +544,306 @@ class WebSocketServer:
             "type": "price_update",
             "data": {
                 "prices": price_data,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
         }
         
         try:
-            await websocket.send(json.dumps(response))
+            await websocket.send(self._dumps(response))
         except Exception as e:
             logger.error(f"Failed to send mock prices: {e}")
     
-    async def broadcast_to_authenticated(self, message: Dict[str, Any]):
-        """Broadcast message to all authenticated clients"""
-        if not self.authenticated_clients:
+    async def broadcast_to_authenticated(self, message: Union[Dict[str, Any], str],
+                                         exclude: Optional[Set[WebSocketServerProtocol]] = None):
+        """Broadcast message to all authenticated clients, except those in exclude
+        
+        The message may be a dict or an already serialized JSON string.
+        """
+        clients = self.authenticated_clients - exclude if exclude else self.authenticated_clients
+        if not clients:
+            return
+        
+        message_str = message if isinstance(message, str) else self._dumps(message)
+        
+        if self.batch_window <= 0 and not self.prepared_cache_bytes:
+            # Encode the frame once and write it to every open client without
+            # awaiting; closed clients are dropped by their handler on disconnect
+            if len(clients) <= _BROADCAST_SLICE:
+                websockets.broadcast(clients, message_str)
+                return
+            
+            # Large fan-out goes out in slices so other tasks run in between
+            clients = list(clients)
+            for start in range(0, len(clients), _BROADCAST_SLICE):
+                if start:
+                    await asyncio.sleep(0)
+                websockets.broadcast(clients[start:start + _BROADCAST_SLICE], message_str)
             return
         
-        message_str = json.dumps(message)
+        self._enqueue(clients, message_str)
+    
+    def _enqueue(self, clients: Set[WebSocketServerProtocol], frame: Union[str, bytes]):
+        """Hand a frame to each client's sender task
+        
+        A slow client only delays itself; once its queue is full further
+        frames are dropped.
+        """
+        for client in clients:
+            queue = self._send_queues.get(client)
+            if queue is None:
+                queue = self._start_sender(client)
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.debug(f"Dropping message for slow client {client.remote_address}")
+    
+    def _start_sender(self, websocket: WebSocketServerProtocol) -> asyncio.Queue:
+        """Create a client's outbound queue and the task that drains it"""
+        queue = self._send_queues[websocket] = asyncio.Queue(maxsize=_CLIENT_QUEUE_SIZE)
+        self._send_tasks[websocket] = asyncio.create_task(self._send_loop(websocket, queue))
+        return queue
+    
+    async def _send_loop(self, websocket: WebSocketServerProtocol, queue: asyncio.Queue):
+        """Deliver a client's queued broadcasts in order; drops the client if a send fails"""
+        try:
+            while True:
+                frame = await queue.get()
+                if isinstance(frame, bytes):
+                    # Binary frames can't join a text batch; send the batch first to keep order
+                    await self._flush_batch(websocket)
+                    await websocket.send(frame)
+                elif self.batch_window > 0:
+                    await self._send_batched(websocket, frame)
+                else:
+                    await self._send_prepared(websocket, frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if not isinstance(e, websockets.exceptions.ConnectionClosed):
+                logger.error(f"Error sending message to client: {e}")
+            self.clients.discard(websocket)
+            self.authenticated_clients.discard(websocket)
+            self.msgpack_clients.discard(websocket)
+            self._drop_batch(websocket)
+            self._send_queues.pop(websocket, None)
+            self._send_tasks.pop(websocket, None)
+    
+    def _drop_sender(self, websocket: WebSocketServerProtocol):
+        """Stop a client's sender task and discard its queued messages"""
+        self._send_queues.pop(websocket, None)
+        task = self._send_tasks.pop(websocket, None)
+        if task:
+            task.cancel()
+    
+    def broadcast(self, message_str: str) -> int:
+        """Write a non-critical message to all authenticated clients without awaiting
+        
+        The frame is serialized once and written straight to each transport.
+        With the prepared cache enabled, clients negotiated without context
+        takeover get the shared pre-compressed frame, so the payload is
+        deflated once per window size rather than once per client.
+        Clients whose write buffer is above writer_limit are skipped rather
+        than buffered further. Returns the number of clients written to.
+        """
+        if not self.authenticated_clients:
+            return 0
         
-        # Send to all authenticated clients
-        disconnected_clients = set()
+        frame = None
+        sent = 0
         
+        # Nothing below awaits or drops clients, so the set is iterated in place;
+        # closed clients are removed by handle_client when they disconnect
         for client in self.authenticated_clients:
+            if not client.open:
+                continue
+            
+            transport = client.transport
+            if transport.get_write_buffer_size() > self.writer_limit:
+                logger.debug(f"Skipping slow client {client.remote_address}")
+                continue
+            
+            # One failing client must not end the fan-out for the rest
             try:
-                await client.send(message_str)
-            except websockets.exceptions.ConnectionClosed:
-                disconnected_clients.add(client)
+                window_bits = self._prepared_window_bits(client) if self.prepared_cache_bytes else None
+                if window_bits is not None:
+                    transport.write(self._get_prepared_frame(message_str, window_bits))
+                else:
+                    if frame is None:
+                        frame = Frame(Opcode.TEXT, message_str.encode("utf-8")).serialize(mask=False)
+                    transport.write(frame)
             except Exception as e:
-                logger.error(f"Error sending message to client: {e}")
-                disconnected_clients.add(client)
+                logger.error(f"Error broadcasting to client {client.remote_address}: {e}")
+                continue
+            sent += 1
         
-        # Remove disconnected clients
-        for client in disconnected_clients:
-            self.clients.discard(client)
-            self.authenticated_clients.discard(client)
+        return sent
     
-    async def broadcast_trade_update(self, trade_data: Dict[str, Any]):
-        """Broadcast trade update to clients"""
+    async def _send_prepared(self, websocket: WebSocketServerProtocol, message_str: str):
+        """Write a shared pre-compressed frame, or fall back to a regular send"""
+        window_bits = self._prepared_window_bits(websocket)
+        if window_bits is None or not websocket.open:
+            await websocket.send(message_str)
+            return
+        
+        websocket.transport.write(self._get_prepared_frame(message_str, window_bits))
+        await websocket.drain()
+    
+    def _prepared_window_bits(self, websocket: WebSocketServerProtocol) -> Optional[int]:
+        """Window size if the client's deflate context is reset per message"""
+        for extension in websocket.extensions:
+            if isinstance(extension, PerMessageDeflate) and extension.local_no_context_takeover:
+                return extension.local_max_window_bits
+        return None
+    
+    def _get_prepared_frame(self, message_str: str, window_bits: int) -> bytes:
+        """Compress and serialize a text frame once, caching it by payload"""
+        key = (message_str, window_bits)
+        frame = self._prepared_frames.get(key)
+        if frame is not None:
+            self._prepared_frames.move_to_end(key)
+            return frame
+        
+        compressor = zlib.compressobj(wbits=-window_bits, memLevel=5)
+        data = compressor.compress(message_str.encode("utf-8")) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data.endswith(_EMPTY_UNCOMPRESSED_BLOCK):
+            data = data[:-4]
+        
+        frame = _compressed_text_frame(data)
+        
+        self._prepared_frames[key] = frame
+        self._prepared_frames_size += len(frame)
+        while self._prepared_frames_size > self.prepared_cache_bytes and self._prepared_frames:
+            _, evicted = self._prepared_frames.popitem(last=False)
+            self._prepared_frames_size -= len(evicted)
+        
+        return frame
+    
+    async def _send_batched(self, websocket: WebSocketServerProtocol, message_str: str):
+        """Queue a message in the client's batch, flushing when the size cap is hit"""
+        buffer = self._batch_buffers.get(websocket)
+        if buffer is None:
+            buffer = self._batch_buffers[websocket] = bytearray()
+            self._batch_timers[websocket] = asyncio.get_running_loop().call_later(
+                self.batch_window, self._on_batch_timer, websocket
+            )
+        elif buffer:
+            buffer += b"\n"
+        
+        buffer += message_str.encode("utf-8")
+        
+        if len(buffer) >= self.batch_max_bytes:
+            await self._flush_batch(websocket)
+    
+    async def _flush_batch(self, websocket: WebSocketServerProtocol):
+        """Send the client's pending batch as a single frame"""
+        timer = self._batch_timers.pop(websocket, None)
+        if timer:
+            timer.cancel()
+        
+        buffer = self._batch_buffers.pop(websocket, None)
+        if buffer:
+            await websocket.send(buffer.decode("utf-8"))
+    
+    def _on_batch_timer(self, websocket: WebSocketServerProtocol):
+        """Flush a batch whose coalescing window has expired"""
+        self._batch_timers.pop(websocket, None)
+        asyncio.create_task(self._flush_batch_quietly(websocket))
+    
+    async def _flush_batch_quietly(self, websocket: WebSocketServerProtocol):
+        """Timer-driven flush; drops the client if the send fails"""
+        try:
+            await self._flush_batch(websocket)
+        except Exception as e:
+            if not isinstance(e, websockets.exceptions.ConnectionClosed):
+                logger.error(f"Error flushing batched messages: {e}")
+            self.clients.discard(websocket)
+            self.authenticated_clients.discard(websocket)
+            self.msgpack_clients.discard(websocket)
+            self._drop_batch(websocket)
+            self._drop_sender(websocket)
+    
+    def _drop_batch(self, websocket: WebSocketServerProtocol):
+        """Discard any pending batch for a client"""
+        timer = self._batch_timers.pop(websocket, None)
+        if timer:
+            timer.cancel()
+        self._batch_buffers.pop(websocket, None)
+    
+    async def _broadcast(self, message_type: str, data: Any, msgpack_ok: bool = False):
+        """Wrap data in the standard envelope and broadcast it
+        
+        With msgpack_ok, clients that asked for msgpack get a binary frame
+        and the rest get JSON.
+        """
         message = {
-            "type": "trade_update",
-            "data": trade_data,
-            "timestamp": datetime.now().isoformat()
+            "type": message_type,
+            "data": data,
+            "timestamp": _now_iso()
         }
         
-        await self.broadcast_to_authenticated(message)
+        binary_clients = self.msgpack_clients if msgpack_ok else None
+        if binary_clients:
+            frame = msgpack.packb(message, use_bin_type=True)
+            if self.batch_window > 0 or self.prepared_cache_bytes:
+                # Through the same sender queue as the client's JSON frames, so
+                # frames stay in emit order and slow clients drop binary frames too
+                self._enqueue(binary_clients, frame)
+            else:
+                websockets.broadcast(binary_clients, frame)
+        
+        await self.broadcast_to_authenticated(message, exclude=binary_clients)
+    
+    async def broadcast_trade_update(self, trade_data: Dict[str, Any]):
+        """Broadcast trade update to clients"""
+        await self._broadcast("trade_update", trade_data, msgpack_ok=True)
+    
+    async def broadcast_trade_batch(self, updates: List[Dict[str, Any]]):
+        """Broadcast several trade updates to clients in one frame"""
+        await self._broadcast("trade_batch", {"updates": updates}, msgpack_ok=True)
     
     async def broadcast_ea_update(self, ea_data: Dict[str, Any]):
         """Broadcast EA update to clients"""
-        message = {
-            "type": "ea_update",
-            "data": ea_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        await self.broadcast_to_authenticated(message)
+        await self._broadcast("ea_update", ea_data)
+    
+    async def broadcast_ea_batch(self, updates: List[Dict[str, Any]]):
+        """Broadcast several EA updates to clients in one frame"""
+        await self._broadcast("ea_batch", {"updates": updates})
     
     async def broadcast_command_update(self, command_data: Dict[str, Any]):
         """Broadcast command update to clients"""
-        message = {
-            "type": "command_update",
-            "data": command_data,
-            "timestamp": datetime.now().isoformat()
-        }
-        
-        await self.broadcast_to_authenticated(message)
+        await self._broadcast("command_update", command_data)
     
     async def broadcast_price_update(self, price_data: Dict[str, Any]):
-        """Broadcast price update to clients"""
+        """Broadcast price update to clients; price_data carries its own timestamp"""
         message = {
             "type": "price_update",
-            "data": price_data,
-            "timestamp": datetime.now().isoformat()
+            "data": price_data
         }
         
-        await self.broadcast_to_authenticated(message)
+        # Price ticks are superseded by the next tick, so slow clients may skip one
+        self.broadcast(self._dumps(message))
+    
+    async def _loop(self, name: str, body: Callable[[], Awaitable[None]], interval: float,
+                    error_delay: float = 5):
+        """Run body every interval seconds while the server is running, backing off on errors"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while self.running:
+            try:
+                await body()
+            except Exception as e:
+                logger.error(f"Error in {name}: {e}")
+                await asyncio.sleep(error_delay)
+                deadline = loop.time()
+                continue
+            
+            # Absolute deadlines keep the cadence fixed however long body() took;
+            # if we fell behind, skip the missed ticks instead of bursting
+            now = loop.time()
+            deadline += interval
+            if deadline < now:
+                deadline = now + interval
+            await asyncio.sleep(deadline - now)
     
     async def start_price_updates(self):
         """Start periodic price updates using price service"""
@@ -456,33 +855,27 @@ class WebSocketServer:
             # Start price simulation
             simulation_task = asyncio.create_task(price_service.start_price_simulation())
             
-            while self.running:
-                try:
-                    # Get current prices from service
-                    prices = price_service.get_prices()
-                    
-                    # Convert to format expected by frontend
-                    price_data = {}
-                    for symbol, price in prices.items():
-                        price_data[symbol] = {
-                            "bid": price.bid,
-                            "ask": price.ask,
-                            "spread": price.spread
-                        }
-                    
-                    # Broadcast price update to all authenticated clients
-                    if self.authenticated_clients:
-                        await self.broadcast_price_update({
-                            "prices": price_data,
-                            "timestamp": datetime.now().isoformat()
-                        })
-                    
-                    # Wait before next update
-                    await asyncio.sleep(2)  # Update every 2 seconds
-                    
-                except Exception as e:
-                    logger.error(f"Error in price updates: {e}")
-                    await asyncio.sleep(5)
+            async def tick():
+                # Get current prices from service
+                prices = price_service.get_prices()
+                
+                # Convert to format expected by frontend
+                price_data = {}
+                for symbol, price in prices.items():
+                    price_data[symbol] = {
+                        "bid": price.bid,
+                        "ask": price.ask,
+                        "spread": price.spread
+                    }
+                
+                # Broadcast price update to all authenticated clients
+                if self.authenticated_clients:
+                    await self.broadcast_price_update({
+                        "prices": price_data,
+                        "timestamp": _now_iso()
+                    })
+            
+            await self._loop("price updates", tick, 2)  # Update every 2 seconds
             
             # Stop price simulation when done
             price_service.stop_price_simulation()
@@ -496,8 +889,6 @@ class WebSocketServer:
     
     async def _basic_price_updates(self):
         """Basic price updates without price service"""
-        import random
-        
         base_prices = {
             "EURUSD": 1.0847,
             "GBPUSD": 1.2634,
@@ -505,34 +896,29 @@ class WebSocketServer:
             "AUDUSD": 0.6523
         }
         
-        while self.running:
-            try:
-                updated_prices = {}
-                
-                for symbol, base_price in base_prices.items():
-                    movement = random.uniform(-0.0010, 0.0010)
-                    spread = 0.0002
-                    
-                    new_price = base_price + movement
-                    base_prices[symbol] = new_price
-                    
-                    updated_prices[symbol] = {
-                        "bid": round(new_price, 5),
-                        "ask": round(new_price + spread, 5),
-                        "spread": spread
-                    }
-                
-                if self.authenticated_clients:
-                    await self.broadcast_price_update({
-                        "prices": updated_prices,
-                        "timestamp": datetime.now().isoformat()
-                    })
+        async def tick():
+            updated_prices = {}
+            
+            for symbol, base_price in base_prices.items():
+                movement = random.uniform(-0.0010, 0.0010)
+                spread = 0.0002
                 
-                await asyncio.sleep(2)
+                new_price = base_price + movement
+                base_prices[symbol] = new_price
                 
-            except Exception as e:
-                logger.error(f"Error in basic price updates: {e}")
-                await asyncio.sleep(5)
+                updated_prices[symbol] = {
+                    "bid": round(new_price, 5),
+                    "ask": round(new_price + spread, 5),
+                    "spread": spread
+                }
+            
+            if self.authenticated_clients:
+                await self.broadcast_price_update({
+                    "prices": updated_prices,
+                    "timestamp": _now_iso()
+                })
+        
+        await self._loop("basic price updates", tick, 2)
     
     def get_status(self) -> Dict[str, Any]:
         """Get server status"""
@@ -542,7 +928,7 @@ class WebSocketServer:
             "port": self.port,
             "total_clients": len(self.clients),
             "authenticated_clients": len(self.authenticated_clients),
-            "timestamp": datetime.now().isoformat()
+            "timestamp": _now_iso()
         }
 
 
@@ -604,4 +990,18 @@ if __name__ == "__main__":
     
     args = parser.parse_args()
     
-    asyncio.run(start_websocket_server_standalone(args.host, args.port, args.auth_token))
\ No newline at end of file
+    entry_point = start_websocket_server_standalone(args.host, args.port, args.auth_token)
+    
+    # Prefer uvloop when installed (not available on Windows)
+    try:
+        import uvloop
+    except ImportError:
+        uvloop = None
+    
+    if uvloop is not None and sys.version_info >= (3, 11):
+        with asyncio.Runner(loop_factory=uvloop.new_event_loop) as runner:
+            runner.run(entry_point)
+    else:
+        if uvloop is not None:
+            uvloop.install()
+        asyncio.run(entry_point)
\ No newline at end of file
@@ -129,7 +129,7 @@ class CompleteServer:
                 app=app,
                 host=self.host,
                 port=self.port,
-                loop="asyncio",
+                loop="auto",
                 log_level="info",
                 access_log=True,
                 use_colors=True
@@ -189,6 +189,13 @@ async def main():
 
 
 if __name__ == "__main__":
+    # Prefer uvloop when installed (not available on Windows)
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+    
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
@@ -0,0 +1,32 @@
+"""
+Tests for the real-time EA updater loop timing
+"""
+import asyncio
+
+import pytest
+
+from services import real_time_ea_updater
+from services.real_time_ea_updater import RealTimeEAUpdater
+
+
+@pytest.mark.ea
+def test_request_wakes_the_update_loop_early(monkeypatch):
+    async def scenario():
+        updater = RealTimeEAUpdater(update_interval=30)
+        monkeypatch.setattr(real_time_ea_updater, "_ea_updater", updater)
+        updater._wakeup = asyncio.Event()
+
+        waiter = asyncio.create_task(updater._wait_for_next_update())
+        await asyncio.sleep(0)
+        real_time_ea_updater.request_ea_update()
+
+        await asyncio.wait_for(waiter, 1)
+        assert not updater._wakeup.is_set()
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.ea
+def test_request_without_updater_is_a_no_op(monkeypatch):
+    monkeypatch.setattr(real_time_ea_updater, "_ea_updater", None)
+    real_time_ea_updater.request_ea_update()
@@ -0,0 +1,45 @@
+"""
+Tests for the WebSocket server startup configuration
+"""
+import asyncio
+import threading
+from dataclasses import replace
+
+from services import start_websocket_server as sws
+from services.start_websocket_server import ServerConfig, _build_parser
+
+
+def test_cli_defaults_match_server_config():
+    config = ServerConfig.from_args(_build_parser().parse_args([]))
+
+    assert replace(config, host=None, port=None) == ServerConfig()
+
+
+def test_cli_flags_override_defaults():
+    args = _build_parser().parse_args(["--batch-window-ms", "20", "--no-nodelay", "--writer-limit", "4096"])
+    config = ServerConfig.from_args(args)
+
+    assert config.batch_window_ms == 20
+    assert config.tcp_nodelay is False
+    assert config.writer_limit == 4096
+
+
+def test_watchdog_fires_after_cleanup_is_cancelled(monkeypatch):
+    fired = threading.Event()
+
+    async def stuck_cleanup():
+        await asyncio.sleep(60)
+
+    monkeypatch.setattr(sws, "_do_cleanup", stuck_cleanup)
+    monkeypatch.setattr(sws, "_force_exit", fired.set)
+    monkeypatch.setattr(sws, "_shutdown_timeout", 0.05)
+
+    async def scenario():
+        task = asyncio.create_task(sws.cleanup())
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+
+    # The loop is gone by the time the watchdog is due
+    asyncio.run(scenario())
+    assert fired.wait(1)
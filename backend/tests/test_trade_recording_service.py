@@ -0,0 +1,371 @@
+"""
+Tests for the trade recording service
+"""
+import asyncio
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from services import trade_recording_service as trs
+from services.trade_recording_service import TradeRecordingService
+
+# trade_records as created before the time columns became epoch-ms INTEGER
+_BASELINE_TABLE_SQL = """
+    CREATE TABLE trade_records (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        trade_id TEXT UNIQUE NOT NULL,
+        ea_id INTEGER,
+        magic_number INTEGER NOT NULL,
+        symbol TEXT NOT NULL,
+        trade_type TEXT NOT NULL,
+        volume REAL NOT NULL,
+        requested_price REAL,
+        actual_price REAL,
+        sl REAL,
+        tp REAL,
+        status TEXT NOT NULL,
+        profit REAL DEFAULT 0.0,
+        commission REAL DEFAULT 0.0,
+        swap REAL DEFAULT 0.0,
+        comment TEXT,
+        request_time TEXT,
+        fill_time TEXT,
+        close_time TEXT,
+        dashboard_command_id TEXT,
+        mt5_ticket INTEGER,
+        risk_percent REAL DEFAULT 0.0,
+        account_balance REAL DEFAULT 0.0,
+        position_size_usd REAL DEFAULT 0.0,
+        created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    path = tmp_path / "trades.db"
+    monkeypatch.setenv("MT5_DB_PATH", str(path))
+    return path
+
+
+@pytest.fixture
+def service(db_path):
+    return TradeRecordingService(None)
+
+
+def _insert_baseline_row(conn, trade_id, request_time, close_time):
+    conn.execute(
+        "INSERT INTO trade_records (trade_id, magic_number, symbol, trade_type, volume, "
+        "status, request_time, close_time) VALUES (?, 1001, 'EURUSD', 'BUY', 0.1, 'closed', ?, ?)",
+        (trade_id, request_time, close_time),
+    )
+
+
+@pytest.mark.database
+class TestEpochTimeMigration:
+    """Existing databases with TEXT time columns"""
+
+    def test_numeric_text_is_read_as_epoch_ms(self):
+        assert trs._from_db_time("1700000000123") == datetime.fromtimestamp(1700000000.123)
+        assert trs._from_db_time("2024-01-02T03:04:05.678900") == datetime(2024, 1, 2, 3, 4, 5, 678900)
+
+    def test_baseline_table_is_rebuilt_with_integer_times(self, db_path, service):
+        iso_close = datetime(2024, 1, 2, 3, 4, 5, 678000)
+        epoch_close = datetime(2024, 1, 3, 3, 4, 5, 123000)
+
+        conn = sqlite3.connect(db_path)
+        conn.execute(_BASELINE_TABLE_SQL)
+        _insert_baseline_row(conn, "iso", iso_close.isoformat(), iso_close.isoformat())
+        # Written by the epoch-ms code into the old table, so stored as text
+        _insert_baseline_row(conn, "epoch", str(trs._to_epoch_ms(epoch_close)), str(trs._to_epoch_ms(epoch_close)))
+        conn.commit()
+        conn.close()
+
+        db = service._get_db_connection()
+
+        types = {row[1]: row[2] for row in db.execute("PRAGMA table_info(trade_records)")}
+        assert [types[name] for name in trs._TIME_COLUMNS] == ["INTEGER"] * 3
+        assert {row[0] for row in db.execute("SELECT typeof(close_time) FROM trade_records")} == {"integer"}
+
+        ordered = [row[0] for row in db.execute("SELECT trade_id FROM trade_records ORDER BY close_time DESC")]
+        assert ordered == ["epoch", "iso"]
+
+        indexes = {row[1] for row in db.execute("PRAGMA index_list(trade_records)")}
+        assert "idx_trade_records_magic_status" in indexes
+
+        assert asyncio.run(service.get_trade_by_id("iso")).close_time == iso_close
+        assert asyncio.run(service.get_trade_by_id("epoch")).request_time == epoch_close
+
+    def test_new_database_is_left_alone(self, service):
+        db = service._get_db_connection()
+        assert db.execute("SELECT count(*) FROM sqlite_master WHERE name = 'trade_records_old'").fetchone() == (0,)
+
+
+def _closed_trade(trade_id, magic_number=1001, profit=0.0, close_time=None):
+    close_time = close_time or datetime(2024, 1, 2, 3, 4, 5)
+    return trs.TradeRecord(
+        trade_id=trade_id,
+        ea_id=0,
+        magic_number=magic_number,
+        symbol="EURUSD",
+        trade_type=trs.TradeType.BUY,
+        volume=0.1,
+        requested_price=1.1,
+        status=trs.TradeStatus.CLOSED,
+        profit=profit,
+        request_time=close_time,
+        close_time=close_time,
+    )
+
+
+@pytest.mark.database
+class TestDatabaseConnections:
+    """Writer and reader connections"""
+
+    def test_database_read_does_not_wait_for_open_write(self, service):
+        service._write_rows([_closed_trade("stored").as_tuple()])
+
+        async def scenario():
+            writer = service._get_db_connection()
+            writer.execute("BEGIN IMMEDIATE")
+            try:
+                return await asyncio.wait_for(service.get_trade_by_id("stored"), 2)
+            finally:
+                writer.execute("ROLLBACK")
+
+        assert asyncio.run(scenario()).trade_id == "stored"
+        asyncio.run(service.close())
+
+    def test_concurrent_first_use_opens_one_connection(self, service, monkeypatch):
+        opened = []
+        open_connection = service._open_connection
+
+        def counting_open():
+            opened.append(1)
+            return open_connection()
+
+        monkeypatch.setattr(service, "_open_connection", counting_open)
+
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(None, service._get_db_connection) for _ in range(8)))
+
+        asyncio.run(scenario())
+        assert len(opened) == 1
+
+
+@pytest.mark.unit
+class TestHistoryEviction:
+    """Bounded in-memory history and its column mirror"""
+
+    def test_evicted_trades_leave_the_columns(self, db_path, monkeypatch):
+        monkeypatch.setattr(trs, "_HISTORY_MAX_RECORDS", 5)
+        service = TradeRecordingService(None)
+        columns = service._history_columns
+        capacity = len(columns.magic)
+
+        for n in range(1, 3001):
+            service._append_history(_closed_trade(f"t{n}", profit=float(n)))
+
+        assert len(service.trade_history) == len(columns) == 5
+        assert len(columns.magic) == capacity
+        assert columns.count(1001) == 5
+        assert service.get_ea_performance_summary(1001)["total_profit"] == sum(range(1, 3001))
+
+    def test_ea_statistics_and_summary_agree_past_the_cap(self, db_path, monkeypatch):
+        monkeypatch.setattr(trs, "_HISTORY_MAX_RECORDS", 3)
+        service = TradeRecordingService(None)
+        asyncio.run(service.register_ea({"magic_number": 1001, "ea_name": "EA", "symbol": "EURUSD"}))
+
+        profits = [10.0, -4.0, 25.0, 10.0, -1.0]
+        for n, profit in enumerate(profits):
+            service._append_history(_closed_trade(f"t{n}", profit=profit))
+        # A trade from another EA pushes out more of this EA's trades
+        service._append_history(_closed_trade("other", magic_number=2002, profit=2.0))
+
+        ea = service.registered_eas[1001]
+        summary = service.get_ea_performance_summary(1001)
+        assert (ea.total_trades, ea.total_profit) == (5, 40.0)
+        assert (summary["total_trades"], summary["total_profit"]) == (5, 40.0)
+        assert (summary["largest_win"], summary["largest_loss"]) == (25.0, -4.0)
+        assert summary["win_rate"] == 60.0
+
+        # A full recompute keeps counting the evicted trades
+        asyncio.run(service._update_ea_statistics(1001))
+        assert (ea.total_trades, ea.total_profit) == (5, 40.0)
+
+
+@pytest.mark.mt5
+class TestFillPayload:
+    """Fill events keep the lax parsing of the old dict lookups"""
+
+    def test_loose_values_are_accepted(self):
+        payload = trs.FillPayload.model_validate({
+            "magic_number": 1001.5,
+            "ticket": "555",
+            "comment": 42,
+            "volume": "0.10",
+            "price": 1,
+            "sl": "",
+            "tp": 0,
+            "commission": "-0.7",
+        })
+
+        assert payload.magic_number == 1001.5
+        assert payload.ticket == "555"
+        assert payload.comment == 42
+        assert payload.volume == 0.1
+        assert payload.price == 1.0
+        assert payload.sl is None and payload.tp is None
+        assert payload.commission == -0.7
+
+    def test_record_fill_with_loose_values(self, service):
+        async def scenario():
+            try:
+                return await service.record_mt5_fill({
+                    "magic_number": "1001",
+                    "ticket": 555,
+                    "symbol": "EURUSD",
+                    "volume": "0.1",
+                    "price": "1.1",
+                    "sl": "1.09",
+                    "comment": None,
+                    "account_balance": "1000",
+                })
+            finally:
+                await service.close()
+
+        assert asyncio.run(scenario()) is True
+        trade = service._by_ticket[555]
+        assert (trade.volume, trade.actual_price, trade.sl) == (0.1, 1.1, 1.09)
+
+
+@pytest.mark.ea
+class TestHeartbeatExpiry:
+    """Active EA tracking through the heartbeat heap"""
+
+    def _register(self, service, magic_number):
+        asyncio.run(service.register_ea({
+            "magic_number": magic_number,
+            "ea_name": f"EA_{magic_number}",
+            "symbol": "EURUSD",
+            "timeframe": "H1",
+            "account_number": str(magic_number),
+        }))
+
+    def test_stale_heartbeat_expires_and_refresh_is_kept(self, service):
+        for magic_number in (1, 2):
+            self._register(service, magic_number)
+
+        old = datetime.now() - timedelta(seconds=service.ea_heartbeat_timeout + 1)
+        service.registered_eas[1].last_heartbeat = old
+        service._heartbeat_heap = [(old, 1), (old, 2)]
+        # EA 2 heartbeated after its heap entry was queued
+        service.registered_eas[2].last_heartbeat = datetime.now()
+
+        assert [ea.magic_number for ea in service.get_active_eas()] == [2]
+        assert service.registered_eas[1].status == "inactive"
+        assert service.registered_eas[2].status == "active"
+
+    def test_returning_ea_keeps_registration_order(self, service):
+        for magic_number in (1, 2, 3):
+            self._register(service, magic_number)
+
+        old = datetime.now() - timedelta(seconds=service.ea_heartbeat_timeout + 1)
+        service.registered_eas[1].last_heartbeat = old
+        service._heartbeat_heap = [(old, 1)] + [(datetime.now(), m) for m in (2, 3)]
+        assert [ea.magic_number for ea in service.get_active_eas()] == [2, 3]
+
+        asyncio.run(service.update_ea_heartbeat(1, {"balance": 100.0}))
+
+        assert [ea.magic_number for ea in service.get_active_eas()] == [1, 2, 3]
+        assert service.get_account_overview()["account_info"]["account_number"] == "1"
+
+    def test_fill_and_returning_heartbeat_wake_ea_updater(self, service):
+        requests = []
+        service._request_ea_update = lambda: requests.append(1)
+        self._register(service, 1)
+
+        asyncio.run(service.update_ea_heartbeat(1))
+        assert requests == []
+
+        service.registered_eas[1].last_heartbeat = datetime.now() - timedelta(seconds=service.ea_heartbeat_timeout + 1)
+        asyncio.run(service.update_ea_heartbeat(1))
+        assert requests == [1]
+
+        async def fill():
+            try:
+                await service.record_mt5_fill({"magic_number": 1, "ticket": 7, "symbol": "EURUSD", "price": 1.1})
+            finally:
+                await service.close()
+
+        asyncio.run(fill())
+        assert requests == [1, 1]
+
+
+@pytest.mark.database
+class TestBatchedWrites:
+    """Writer task batching and shutdown drain"""
+
+    def test_burst_is_written_in_batches_and_close_drains(self, db_path, service, monkeypatch):
+        batches = []
+        write_rows = service._write_rows
+
+        def recording_write(rows):
+            batches.append(len(rows))
+            write_rows(rows)
+
+        monkeypatch.setattr(service, "_write_rows", recording_write)
+        total = trs._WRITE_BATCH_SIZE + 20
+
+        async def scenario():
+            for n in range(total):
+                await service._store_trade_record(_closed_trade(f"t{n}"))
+            await service.close()
+
+        asyncio.run(scenario())
+
+        assert batches == [trs._WRITE_BATCH_SIZE, 20]
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT count(*) FROM trade_records").fetchone() == (total,)
+
+    def test_later_snapshot_of_a_trade_wins(self, db_path, service):
+        trade = _closed_trade("t1", profit=1.0)
+
+        async def scenario():
+            await service._store_trade_record(trade)
+            trade.profit = 5.0
+            await service._store_trade_record(trade)
+            await service.close()
+
+        asyncio.run(scenario())
+        with sqlite3.connect(db_path) as conn:
+            assert conn.execute("SELECT profit FROM trade_records WHERE trade_id = 't1'").fetchone() == (5.0,)
+
+
+@pytest.mark.unit
+class TestSummaryCache:
+    """Performance summaries cached per EA change counter"""
+
+    def test_summary_is_reused_until_the_ea_changes(self, db_path):
+        service = TradeRecordingService(None)
+        service._append_history(_closed_trade("a", profit=4.0))
+
+        first = service.get_ea_performance_summary(1001)
+        assert service.get_ea_performance_summary(1001) == first
+        assert service._summary_cache[1001][0] == service._ea_seq[1001]
+
+        # Another EA's trade leaves this EA's entry valid
+        service._append_history(_closed_trade("b", magic_number=2002, profit=9.0))
+        assert service._summary_cache[1001][0] == service._ea_seq[1001]
+
+        service._append_history(_closed_trade("c", profit=-1.0))
+        assert service.get_ea_performance_summary(1001)["total_profit"] == 3.0
+
+
+@pytest.mark.ea
+def test_ea_update_requests_reach_the_routes_updater(service):
+    from services import real_time_ea_updater
+
+    assert service._request_ea_update is real_time_ea_updater.request_ea_update
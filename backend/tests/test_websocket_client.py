@@ -0,0 +1,69 @@
+"""
+Tests for the WebSocket client helper
+"""
+import asyncio
+import functools
+import json
+
+import pytest
+
+from services.websocket_client import WebSocketClient
+
+
+class _FrameSource:
+    """Async iterable standing in for a connection that yields fixed frames"""
+
+    def __init__(self, frames):
+        self.frames = list(frames)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        if not self.frames:
+            raise StopAsyncIteration
+        return self.frames.pop(0)
+
+
+def _run_frames(client, frames):
+    client.websocket = _FrameSource(frames)
+    asyncio.run(client.message_handler())
+
+
+@pytest.mark.websocket
+class TestMessageHandlers:
+    """Dispatch of registered message handlers"""
+
+    def test_sync_async_and_wrapped_handlers_all_run(self):
+        received = []
+
+        def sync_handler(payload):
+            received.append(("sync", payload["n"]))
+
+        async def async_handler(tag, payload):
+            await asyncio.sleep(0)
+            received.append((tag, payload["n"]))
+
+        client = WebSocketClient("ws://unused")
+        client.register_message_handler("a", sync_handler)
+        client.register_message_handler("b", functools.partial(async_handler, "partial"))
+        client.register_message_handler("c", lambda payload: async_handler("lambda", payload))
+
+        _run_frames(client, [
+            json.dumps({"type": "a", "data": {"n": 1}}),
+            json.dumps({"type": "b", "data": {"n": 2}}),
+            json.dumps({"type": "c", "data": {"n": 3}}),
+        ])
+
+        assert received == [("sync", 1), ("partial", 2), ("lambda", 3)]
+
+    def test_batched_frame_is_split_into_messages(self):
+        received = []
+
+        client = WebSocketClient("ws://unused")
+        client.register_message_handler("trade_update", lambda payload: received.append(payload["ticket"]))
+
+        frame = "\n".join(json.dumps({"type": "trade_update", "data": {"ticket": n}}) for n in (1, 2))
+        _run_frames(client, [frame])
+
+        assert received == [1, 2]
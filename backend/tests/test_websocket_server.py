@@ -0,0 +1,193 @@
+"""
+Tests for the WebSocket server broadcast paths
+"""
+import asyncio
+import json
+import socket
+
+import pytest
+import websockets
+
+from services.websocket_server import WebSocketServer
+
+
+def _free_port():
+    """Pick a free local port for a test server"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _start(**kwargs):
+    """Start a server on a free port and wait until it accepts connections"""
+    server = WebSocketServer(host="127.0.0.1", port=_free_port(), auth_token="test_token", **kwargs)
+    task = asyncio.create_task(server.start_server())
+    while not server.running:
+        await asyncio.sleep(0.01)
+    return server, task
+
+
+async def _stop(server, task):
+    await server.stop_server()
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def _authenticate(ws):
+    await ws.send(json.dumps({"type": "auth", "data": {"token": "test_token"}}))
+    response = json.loads(await asyncio.wait_for(ws.recv(), 2))
+    assert response["data"]["status"] == "authenticated"
+
+
+async def _receive_type(ws, message_type):
+    """Read frames until one of the given type arrives, skipping price ticks"""
+    while True:
+        message = json.loads(await asyncio.wait_for(ws.recv(), 2))
+        if message["type"] == message_type:
+            return message
+
+
+@pytest.mark.websocket
+class TestPreparedFrames:
+    """Broadcasts through the pre-compressed frame cache"""
+
+    def test_deflate_client_receives_prepared_broadcasts(self):
+        async def scenario():
+            server, task = await _start(prepared_cache_mb=1)
+            try:
+                async with websockets.connect(f"ws://127.0.0.1:{server.port}") as ws:
+                    await _authenticate(ws)
+
+                    payload = {"symbol": "EURUSD", "note": "x" * 300}
+                    server.broadcast(json.dumps({"type": "tick", "data": payload}))
+                    await server.broadcast_ea_update({"magic_number": 1001})
+
+                    tick = await _receive_type(ws, "tick")
+                    ea_update = await _receive_type(ws, "ea_update")
+
+                    assert tick["data"] == payload
+                    assert ea_update["data"] == {"magic_number": 1001}
+                    assert server._prepared_frames
+            finally:
+                await _stop(server, task)
+
+        asyncio.run(scenario())
+
+    def test_large_payload_uses_extended_length(self):
+        async def scenario():
+            server, task = await _start(prepared_cache_mb=1)
+            try:
+                async with websockets.connect(f"ws://127.0.0.1:{server.port}", max_size=None) as ws:
+                    await _authenticate(ws)
+
+                    # Random-looking text so the deflated payload stays above 64 KiB
+                    payload = "".join(format(i * 2654435761 % 2 ** 32, "x") for i in range(20000))
+                    server.broadcast(json.dumps({"type": "blob", "data": payload}))
+
+                    message = await _receive_type(ws, "blob")
+                    assert message["data"] == payload
+            finally:
+                await _stop(server, task)
+
+        asyncio.run(scenario())
+
+
+class _FakeTransport:
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.written = []
+
+    def get_write_buffer_size(self):
+        return 0
+
+    def write(self, data):
+        if self.fail:
+            raise RuntimeError("transport broken")
+        self.written.append(data)
+
+
+class _FakeClient:
+    def __init__(self, fail=False):
+        self.open = True
+        self.transport = _FakeTransport(fail)
+        self.remote_address = ("127.0.0.1", 0)
+        self.extensions = []
+
+
+@pytest.mark.websocket
+def test_broadcast_continues_past_failing_client():
+    async def scenario():
+        server = WebSocketServer(host="127.0.0.1", port=_free_port(), auth_token="test_token")
+        broken, healthy = _FakeClient(fail=True), _FakeClient()
+        server.authenticated_clients.update({broken, healthy})
+
+        assert server.broadcast(json.dumps({"type": "tick"})) == 1
+        assert len(healthy.transport.written) == 1
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.websocket
+def test_batched_broadcasts_arrive_as_newline_delimited_frame():
+    async def scenario():
+        server, task = await _start(batch_window_ms=20)
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{server.port}") as ws:
+                await _authenticate(ws)
+
+                await server.broadcast_trade_update({"ticket": 1})
+                await server.broadcast_ea_update({"magic_number": 2})
+
+                frame = await asyncio.wait_for(ws.recv(), 2)
+                messages = [json.loads(line) for line in frame.split("\n")]
+                assert [m["type"] for m in messages] == ["trade_update", "ea_update"]
+        finally:
+            await _stop(server, task)
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.websocket
+def test_ping_response_does_not_keep_client_data():
+    async def scenario():
+        server = WebSocketServer(host="127.0.0.1", port=_free_port(), auth_token="test_token")
+        sent = []
+
+        class _Recorder:
+            async def send(self, frame):
+                sent.append(json.loads(frame))
+
+        await server.handle_ping(_Recorder(), {"data": {"secret": "client-a"}})
+
+        assert sent[0]["data"]["original_data"] == {"secret": "client-a"}
+        assert server._pong_response["data"]["original_data"] is None
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.websocket
+def test_msgpack_client_keeps_emit_order_with_batching():
+    msgpack = pytest.importorskip("msgpack")
+
+    async def scenario():
+        server, task = await _start(batch_window_ms=50)
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{server.port}") as ws:
+                await ws.send(json.dumps({"type": "auth", "data": {"token": "test_token", "encoding": "msgpack"}}))
+                response = json.loads(await asyncio.wait_for(ws.recv(), 2))
+                assert response["data"]["encoding"] == "msgpack"
+
+                await server.broadcast_ea_update({"magic_number": 1})
+                await server.broadcast_trade_update({"ticket": 2})
+
+                received = []
+                while len(received) < 2:
+                    frame = await asyncio.wait_for(ws.recv(), 2)
+                    message = msgpack.unpackb(frame) if isinstance(frame, bytes) else json.loads(frame)
+                    if message["type"] != "price_update":
+                        received.append(message["type"])
+                assert received == ["ea_update", "trade_update"]
+        finally:
+            await _stop(server, task)
+
+    asyncio.run(scenario())